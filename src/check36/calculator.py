@@ -1,31 +1,54 @@
 """Core calculation logic for 36 Agreement compliance check"""
 
 import math
+from collections.abc import Iterable, Iterator
+from datetime import date
 from typing import Literal
 
-from .models import LimitAssessment, RecoveryOption, SimpleAssessmentOutput, SimpleInput
+from .models import (
+    DailyWorkEntry,
+    LimitAssessment,
+    PaceConfig,
+    RecoveryOption,
+    SimpleAssessmentOutput,
+    SimpleInput,
+)
+from .pace import PACE_MODEL_LABELS, PaceModel, PaceState
+from .patterns import count_working_days, remaining_weekday_counts
+from .streaming import InputErrors
 from .utils import (
     calculate_legal_work_hours,
     get_current_date,
     get_days_in_month,
-    get_elapsed_weekdays_in_month,
-    get_remaining_weekdays_in_month,
     parse_date,
 )
 
 
-def assess_current_month(input_data: SimpleInput) -> SimpleAssessmentOutput:
-    """現在の月の36協定上限到達リスクを評価"""
+def assess_current_month(
+    input_data: SimpleInput, pace_state: PaceState | None = None
+) -> SimpleAssessmentOutput:
+    """現在の月の36協定上限到達リスクを評価
+
+    Args:
+        input_data: 入力
+        pace_state: 逐次更新済みのペース状態（省略時は input_data.dailyRecords から構築）
+    """
 
     # 日付の取得・パース
     current_date_str = input_data.currentDate or get_current_date()
-    year, month, _ = parse_date(current_date_str)
+    year, month, day = parse_date(current_date_str)
     
     # 稼働日数の決定（自動計算 or 手動入力）
+    pattern_start = (
+        date.fromisoformat(input_data.workingPatternStart)
+        if input_data.workingPatternStart
+        else None
+    )
     if input_data.autoCalculateWeekdays:
-        # 土日を除外して自動計算
-        working_days_elapsed = get_elapsed_weekdays_in_month(current_date_str)
-        working_days_remaining = get_remaining_weekdays_in_month(current_date_str)
+        # 勤務パターンの稼働日マスクから自動計算（既定は月〜金）
+        working_days_elapsed, working_days_remaining = count_working_days(
+            input_data.workingPattern, year, month, day, pattern_start
+        )
     else:
         # 手動入力値を使用（後方互換性）
         working_days_elapsed = input_data.workingDaysElapsed or 0
@@ -36,12 +59,33 @@ def assess_current_month(input_data: SimpleInput) -> SimpleAssessmentOutput:
     legal_work_hours = calculate_legal_work_hours(days_in_month)
 
     # 予測計算
-    avg_daily_hours = _calculate_average_daily_hours(
-        input_data.totalWorkHoursToDate, working_days_elapsed
-    )
-    projected_total_hours = input_data.totalWorkHoursToDate + (
-        working_days_remaining * avg_daily_hours
-    )
+    pace_model: PaceModel = input_data.paceModel
+    if pace_state is None and pace_model != "mean" and input_data.dailyRecords:
+        # 他の月・基準日以降の実績は「前日までの実績」ではないため使わない
+        daily_records = _records_before(input_data.dailyRecords, year, month, day)
+        pace_state = build_pace_state(daily_records, input_data)
+
+    if pace_model == "weekday" and not input_data.autoCalculateWeekdays:
+        # 手動入力では残り稼働日の曜日構成が分からないため、累計平均で代用する
+        pace_model = "mean"
+
+    if pace_model == "mean" or pace_state is None or pace_state.count == 0:
+        # 累計平均（従来方式）。日次実績がない場合もこちらで代用
+        pace_model = "mean"
+        avg_daily_hours = _calculate_average_daily_hours(
+            input_data.totalWorkHoursToDate, working_days_elapsed
+        )
+        remaining_hours = working_days_remaining * avg_daily_hours
+    else:
+        weekday_counts = (
+            remaining_weekday_counts(input_data.workingPattern, year, month, day, pattern_start)
+            if pace_model == "weekday"
+            else None
+        )
+        remaining_hours = pace_state.project_remaining_hours(
+            pace_model, working_days_remaining, weekday_counts
+        )
+    projected_total_hours = input_data.totalWorkHoursToDate + remaining_hours
     projected_overtime = projected_total_hours - legal_work_hours
     projected_overtime_with_holiday = projected_overtime + input_data.holidayWorkHoursToDate
 
@@ -80,6 +124,7 @@ def assess_current_month(input_data: SimpleInput) -> SimpleAssessmentOutput:
         "月45時間上限（時間外労働+休日労働）",
         "80時間基準（時間外労働+休日労働、簡易単月評価）",
         f"月の法定労働時間: {legal_work_hours:.1f}時間（{days_in_month}日の月）",
+        f"予測モデル: {PACE_MODEL_LABELS[pace_model]}（{pace_model}）",
     ]
 
     return SimpleAssessmentOutput(
@@ -87,6 +132,55 @@ def assess_current_month(input_data: SimpleInput) -> SimpleAssessmentOutput:
     )
 
 
+def assess_batch(
+    records: Iterable[tuple[str, SimpleInput]],
+    errors: InputErrors | None = None,
+) -> Iterator[tuple[str, SimpleAssessmentOutput]]:
+    """複数従業員の評価を逐次実行（ジェネレーター）
+
+    入力を1件ずつ評価して即座に返すため、件数に関わらず結果を一括で保持しない。
+
+    Args:
+        records: (従業員ID, 入力) のイテラブル
+        errors: 指定時は評価できなかった入力を読み飛ばし、その行番号とともに記録する。
+            省略時は ValueError をそのまま送出する
+
+    Yields:
+        (従業員ID, 評価結果)
+    """
+    for employee_id, input_data in records:
+        try:
+            result = assess_current_month(input_data)
+        except ValueError as e:
+            if errors is None:
+                raise
+            errors.add(errors.line_no, f"{employee_id}: {e}")
+            continue
+        yield employee_id, result
+
+
+def build_pace_state(
+    daily_records: Iterable[DailyWorkEntry], input_data: SimpleInput | None = None
+) -> PaceState:
+    """日次実績からペース状態を構築（1件ごとにO(1)で更新）"""
+    pace_config = PaceConfig()
+    if input_data and input_data.config:
+        pace_config = input_data.config.pace
+
+    pace_state = PaceState(alpha=pace_config.ewmaAlpha, trailing_days=pace_config.trailingDays)
+    for record in daily_records:
+        pace_state.update(date.fromisoformat(record.date).weekday(), record.workHours)
+    return pace_state
+
+
+def _records_before(
+    daily_records: Iterable[DailyWorkEntry], year: int, month: int, day: int
+) -> list[DailyWorkEntry]:
+    """当月1日から基準日の前日までの日次実績を抽出"""
+    start, end = date(year, month, 1), date(year, month, day)
+    return [r for r in daily_records if start <= date.fromisoformat(r.date) < end]
+
+
 def _calculate_average_daily_hours(total_hours: float, elapsed_days: int) -> float:
     """1日あたり平均労働時間を計算"""
     if elapsed_days == 0:
@@ -0,0 +1,136 @@
+"""Local load generator for the HTTP transport
+
+HTTPで起動したサーバーに対して assess_current_month_tool を指定の並列度で呼び出し、
+スループットとレイテンシ分布（p50/p90/p99/最大）を表示する。
+
+    python -m check36.loadgen --url http://127.0.0.1:8000/mcp --concurrency 32 --requests 2000
+"""
+
+import argparse
+import asyncio
+import json
+import math
+import random
+import time
+from typing import Any
+
+from fastmcp import Client
+
+DEFAULT_URL = "http://127.0.0.1:8000/mcp"
+TOOL_NAME = "assess_current_month_tool"
+PERCENTILES = (50.0, 90.0, 99.0)
+
+
+def percentile(sorted_values: list[float], pct: float) -> float:
+    """昇順に並んだ値の百分位（最近傍順位法）"""
+    if not sorted_values:
+        return 0.0
+    rank = max(1, math.ceil(pct / 100.0 * len(sorted_values)))
+    return sorted_values[rank - 1]
+
+
+def summarize(latencies: list[float], elapsed: float, errors: int) -> dict[str, Any]:
+    """計測結果を集計（レイテンシはミリ秒）"""
+    ordered = sorted(latencies)
+    summary: dict[str, Any] = {
+        "requests": len(latencies) + errors,
+        "succeeded": len(latencies),
+        "errors": errors,
+        "elapsedSeconds": round(elapsed, 3),
+        "throughputPerSecond": round(len(latencies) / elapsed, 1) if elapsed > 0 else 0.0,
+    }
+    for pct in PERCENTILES:
+        summary[f"p{pct:g}Ms"] = round(percentile(ordered, pct) * 1000, 2)
+    summary["maxMs"] = round(ordered[-1] * 1000, 2) if ordered else 0.0
+    return summary
+
+
+def _random_arguments(rng: random.Random) -> dict[str, Any]:
+    """評価ツールの入力をランダムに生成"""
+    day = rng.randint(1, 28)
+    return {
+        "totalWorkHoursToDate": round(rng.uniform(0.0, 10.5) * day * 5 / 7, 1),
+        "holidayWorkHoursToDate": round(rng.choice([0.0, 0.0, 4.0, 8.0]), 1),
+        "currentDate": f"2025-10-{day:02d}",
+    }
+
+
+async def _worker(
+    url: str,
+    remaining: list[int],
+    latencies: list[float],
+    errors: list[int],
+    session_errors: list[int],
+    seed: int,
+) -> None:
+    """1セッション分の呼び出しループ（残り件数がなくなるまで）
+
+    接続できない・途中で切断されたセッションは終了し、セッションエラーとして数える
+    （他のセッションの計測は続ける）。
+    """
+    rng = random.Random(seed)
+    try:
+        async with Client(url) as client:
+            while remaining[0] > 0:
+                remaining[0] -= 1
+                start = time.perf_counter()
+                try:
+                    await client.call_tool(TOOL_NAME, _random_arguments(rng))
+                except Exception:
+                    errors[0] += 1
+                    continue
+                latencies.append(time.perf_counter() - start)
+    except Exception:
+        session_errors[0] += 1
+
+
+async def run_load(url: str, concurrency: int, requests: int, seed: int = 0) -> dict[str, Any]:
+    """指定の並列度で負荷をかけ、集計結果を返す"""
+    latencies: list[float] = []
+    errors = [0]
+    session_errors = [0]
+    remaining = [requests]
+
+    start = time.perf_counter()
+    await asyncio.gather(
+        *(
+            _worker(url, remaining, latencies, errors, session_errors, seed + i)
+            for i in range(min(concurrency, requests))
+        )
+    )
+    elapsed = time.perf_counter() - start
+
+    # 全セッションが失敗して送れなかったリクエストもエラーとして数える
+    summary = summarize(latencies, elapsed, errors[0] + remaining[0])
+    summary["concurrency"] = concurrency
+    summary["sessionErrors"] = session_errors[0]
+    return summary
+
+
+def main(argv: list[str] | None = None) -> None:
+    """負荷生成を実行して結果を表示"""
+    parser = argparse.ArgumentParser(
+        prog="check36-loadgen", description="check36 HTTPサーバーの負荷生成"
+    )
+    parser.add_argument(
+        "--url", default=DEFAULT_URL, help=f"MCPエンドポイント（既定: {DEFAULT_URL}）"
+    )
+    parser.add_argument("--concurrency", type=int, default=16, help="同時セッション数")
+    parser.add_argument("--requests", type=int, default=1000, help="総リクエスト数")
+    parser.add_argument("--seed", type=int, default=0, help="入力生成の乱数シード")
+    parser.add_argument("--json", action="store_true", help="結果をJSONで出力")
+    args = parser.parse_args(argv)
+    if args.concurrency < 1 or args.requests < 1:
+        parser.error("--concurrency and --requests must be at least 1")
+
+    summary = asyncio.run(run_load(args.url, args.concurrency, args.requests, args.seed))
+
+    if args.json:
+        print(json.dumps(summary, ensure_ascii=False))
+        return
+    for key, value in summary.items():
+        print(f"{key}: {value}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,14 +1,52 @@
 """Pydantic models for input/output validation"""
 
+from datetime import date
 from typing import Literal, Optional
 
-from pydantic import BaseModel, Field, field_validator
+from pydantic import BaseModel, Field, ValidationInfo, field_validator
+
+from .pace import DEFAULT_EWMA_ALPHA, DEFAULT_TRAILING_DAYS, PaceModel
+from .patterns import DEFAULT_WORKING_PATTERN, WORKING_PATTERNS
+
+
+class PaceConfig(BaseModel):
+    """予測ペースモデルの設定"""
+
+    ewmaAlpha: float = Field(
+        default=DEFAULT_EWMA_ALPHA, gt=0, le=1, description="EWMAの平滑化係数（0より大きく1以下）"
+    )
+    trailingDays: int = Field(
+        default=DEFAULT_TRAILING_DAYS, ge=1, description="trailing モデルで平均する直近日数"
+    )
+
+
+def validate_calendar_date(value: str) -> str:
+    """暦上に存在する日付（YYYY-MM-DD）か検証"""
+    try:
+        date.fromisoformat(value)
+    except ValueError:
+        raise ValueError(f"Invalid calendar date: {value}") from None
+    return value
 
 
 class ConfigModel(BaseModel):
     """設定モデル"""
 
     thresholds: dict[str, float] = Field(default_factory=lambda: {"warnRatio": 0.8})
+    pace: PaceConfig = Field(default_factory=PaceConfig)
+
+
+class DailyWorkEntry(BaseModel):
+    """日次労働時間（ペース推定用）"""
+
+    date: str = Field(pattern=r"^\d{4}-\d{2}-\d{2}$", description="労働日（YYYY-MM-DD）")
+    workHours: float = Field(ge=0, description="総労働時間（休日労働を除く）")
+
+    @field_validator("date")
+    @classmethod
+    def validate_date(cls, v: str) -> str:
+        """存在しない日付（2025-10-32 等）を拒否"""
+        return validate_calendar_date(v)
 
 
 class SimpleInput(BaseModel):
@@ -24,8 +62,47 @@ class SimpleInput(BaseModel):
     autoCalculateWeekdays: bool = Field(
         default=True, description="土日を除外して自動計算するか（True: 平日のみ、False: 手動入力値を使用）"
     )
+    workingPattern: str = Field(
+        default=DEFAULT_WORKING_PATTERN,
+        description="勤務パターン名（自動計算時の稼働日判定に使用、既定: weekdays=月〜金）",
+    )
+    workingPatternStart: Optional[str] = Field(
+        None,
+        pattern=r"^\d{4}-\d{2}-\d{2}$",
+        description="交替勤務の周期の勤務初日（YYYY-MM-DD、班ごとに周期がずれる場合に指定）",
+    )
+    paceModel: PaceModel = Field(
+        default="mean", description="月末予測のペースモデル（mean / ewma / weekday / trailing）"
+    )
+    dailyRecords: Optional[list[DailyWorkEntry]] = Field(
+        None,
+        description="当月の日次労働時間（日付順、mean以外のペースモデルで使用。"
+        "基準日の前日までの当月分のみ使用し、それ以外は無視）",
+    )
     config: Optional[ConfigModel] = None
 
+    @field_validator("workingPattern")
+    @classmethod
+    def validate_working_pattern(cls, v: str) -> str:
+        """勤務パターン名の検証"""
+        if v not in WORKING_PATTERNS:
+            raise ValueError(f"Unknown working pattern: {v}")
+        return v
+
+    @field_validator("workingPatternStart")
+    @classmethod
+    def validate_working_pattern_start(
+        cls, v: Optional[str], info: ValidationInfo
+    ) -> Optional[str]:
+        """勤務初日の検証（交替勤務パターンのみ指定可能）"""
+        if v is None:
+            return v
+        validate_calendar_date(v)
+        pattern = WORKING_PATTERNS.get(info.data.get("workingPattern", ""))
+        if pattern is not None and not pattern.is_rotating:
+            raise ValueError("workingPatternStart applies only to rotating working patterns")
+        return v
+
     @field_validator("currentDate")
     @classmethod
     def validate_date_format(cls, v: Optional[str]) -> Optional[str]:
@@ -42,6 +119,21 @@ class SimpleInput(BaseModel):
         return v
 
 
+class DailyWorkRecord(BaseModel):
+    """日次労働実績"""
+
+    employeeId: str = Field(min_length=1, description="従業員ID")
+    date: str = Field(pattern=r"^\d{4}-\d{2}-\d{2}$", description="労働日（YYYY-MM-DD）")
+    workHours: float = Field(ge=0, description="総労働時間（休日労働を除く）")
+    holidayWorkHours: float = Field(default=0.0, ge=0, description="休日労働時間")
+
+    @field_validator("date")
+    @classmethod
+    def validate_date(cls, v: str) -> str:
+        """存在しない日付（2025-02-30 等）を拒否"""
+        return validate_calendar_date(v)
+
+
 class RecoveryOption(BaseModel):
     """リカバリー選択肢"""
 
@@ -0,0 +1,120 @@
+"""Incremental pace models for month-end projection
+
+日次実績から1日あたりのペースを推定する。各モデルの状態は実績1件ごとにO(1)で更新でき、
+履歴を再走査せずに予測できる。実績は日付順に与えること（EWMA・直近N日は順序に依存する）。
+
+    mean:     累計平均（従来方式）
+    ewma:     指数加重移動平均（直近の実績ほど重く扱う）
+    weekday:  曜日別平均（残り稼働日の曜日構成で積み上げ）
+    trailing: 直近N日の平均
+"""
+
+from collections import deque
+from typing import Literal
+
+PaceModel = Literal["mean", "ewma", "weekday", "trailing"]
+
+DEFAULT_EWMA_ALPHA = 0.3
+DEFAULT_TRAILING_DAYS = 5
+DEFAULT_DAILY_HOURS = 8.0
+
+PACE_MODEL_LABELS: dict[str, str] = {
+    "mean": "累計平均ペース",
+    "ewma": "指数加重移動平均ペース",
+    "weekday": "曜日別平均ペース",
+    "trailing": "直近日数平均ペース",
+}
+
+
+class PaceState:
+    """各ペースモデルの逐次更新状態"""
+
+    __slots__ = (
+        "alpha",
+        "trailing_days",
+        "count",
+        "total",
+        "ewma",
+        "weekday_totals",
+        "weekday_counts",
+        "window",
+        "window_total",
+    )
+
+    def __init__(
+        self, alpha: float = DEFAULT_EWMA_ALPHA, trailing_days: int = DEFAULT_TRAILING_DAYS
+    ) -> None:
+        if not 0.0 < alpha <= 1.0:
+            raise ValueError("alpha must be in (0, 1]")
+        if trailing_days < 1:
+            raise ValueError("trailing_days must be at least 1")
+        self.alpha = alpha
+        self.trailing_days = trailing_days
+        self.count = 0
+        self.total = 0.0
+        self.ewma = 0.0
+        self.weekday_totals = [0.0] * 7
+        self.weekday_counts = [0] * 7
+        self.window: deque[float] = deque(maxlen=trailing_days)
+        self.window_total = 0.0
+
+    def update(self, weekday: int, hours: float) -> None:
+        """1日分の実績を反映（weekday: 月曜日=0, 日曜日=6）"""
+        self.ewma = hours if self.count == 0 else self.alpha * hours + (1 - self.alpha) * self.ewma
+        self.count += 1
+        self.total += hours
+        self.weekday_totals[weekday] += hours
+        self.weekday_counts[weekday] += 1
+        if len(self.window) == self.trailing_days:
+            self.window_total -= self.window[0]
+        self.window.append(hours)
+        self.window_total += hours
+
+    def copy(self) -> "PaceState":
+        """独立して更新できる複製を返す"""
+        clone = PaceState(self.alpha, self.trailing_days)
+        clone.count = self.count
+        clone.total = self.total
+        clone.ewma = self.ewma
+        clone.weekday_totals = list(self.weekday_totals)
+        clone.weekday_counts = list(self.weekday_counts)
+        clone.window.extend(self.window)
+        clone.window_total = self.window_total
+        return clone
+
+    def daily_pace(self, model: PaceModel) -> float:
+        """1日あたりのペース（実績がなければ既定値）"""
+        if self.count == 0:
+            return DEFAULT_DAILY_HOURS
+        if model == "ewma":
+            return self.ewma
+        if model == "trailing":
+            return self.window_total / len(self.window)
+        return self.total / self.count
+
+    def weekday_pace(self, weekday: int) -> float:
+        """曜日別のペース（その曜日の実績がなければ累計平均）"""
+        if self.weekday_counts[weekday] == 0:
+            return self.daily_pace("mean")
+        return self.weekday_totals[weekday] / self.weekday_counts[weekday]
+
+    def project_remaining_hours(
+        self,
+        model: PaceModel,
+        working_days_remaining: int,
+        remaining_weekday_counts: list[int] | None = None,
+    ) -> float:
+        """残り稼働日の予測労働時間
+
+        weekday モデルは残り稼働日の曜日別日数が分かる場合のみ曜日別に積み上げ、
+        分からない場合は累計平均で代用する。
+        """
+        if model == "weekday":
+            if remaining_weekday_counts is None:
+                return working_days_remaining * self.daily_pace("mean")
+            return sum(
+                days * self.weekday_pace(weekday)
+                for weekday, days in enumerate(remaining_weekday_counts)
+                if days
+            )
+        return working_days_remaining * self.daily_pace(model)
@@ -0,0 +1,124 @@
+"""Named working patterns with per-month bitmask day sets
+
+勤務パターン（平日勤務・火〜土・4勤4休などの交替勤務）ごとに、各月の稼働日を
+31ビットのマスク（ビット d-1 が d日）で表す。経過・残り稼働日数はマスクとビット数の
+カウントで求めるため、日ごとのループは不要。マスクは (パターン, 勤務初日, 年, 月) ごとに
+キャッシュするので、同じパターン・同じ班の従業員が何人いても計算は1回で済む。
+"""
+
+import calendar
+from datetime import date
+from functools import lru_cache
+
+DEFAULT_WORKING_PATTERN = "weekdays"
+
+# 曜日ごとの判定に使う基準日（月曜日）
+_MONDAY_ANCHOR = date(2024, 1, 1)
+
+
+class WorkingPattern:
+    """周期的な勤務パターン
+
+    基準日を位相0とし、周期 period 日のうち cycle_mask のビットが立つ位相を稼働日とする。
+    交替勤務（rotating で生成）は班ごとに周期がずれるため、評価時に基準日を差し替えられる。
+    """
+
+    __slots__ = ("cycle_mask", "period", "anchor", "is_rotating")
+
+    def __init__(
+        self, cycle_mask: int, period: int, anchor: date, is_rotating: bool = False
+    ) -> None:
+        if period < 1 or period > 31:
+            raise ValueError("period must be between 1 and 31")
+        if cycle_mask <= 0 or cycle_mask >= 1 << period:
+            raise ValueError("cycle_mask must select at least one day within the period")
+        self.cycle_mask = cycle_mask
+        self.period = period
+        self.anchor = anchor
+        self.is_rotating = is_rotating
+
+    @classmethod
+    def weekly(cls, weekdays: list[int]) -> "WorkingPattern":
+        """曜日指定のパターン（月曜日=0, 日曜日=6）"""
+        if not weekdays or any(not 0 <= w <= 6 for w in weekdays):
+            raise ValueError("weekdays must be a non-empty list of 0-6")
+        return cls(sum(1 << w for w in set(weekdays)), 7, _MONDAY_ANCHOR)
+
+    @classmethod
+    def rotating(cls, on_days: int, off_days: int, anchor: date) -> "WorkingPattern":
+        """交替勤務パターン（anchor を勤務初日として on_days 勤務・off_days 休み）"""
+        if on_days < 1 or off_days < 0:
+            raise ValueError("on_days must be positive and off_days non-negative")
+        return cls((1 << on_days) - 1, on_days + off_days, anchor, is_rotating=True)
+
+    def month_mask(self, year: int, month: int, anchor: date | None = None) -> int:
+        """当月の稼働日マスクを生成（ビット d-1 が d日、anchor 指定時はそれを基準日とする）"""
+        days_in_month = calendar.monthrange(year, month)[1]
+        phase = (date(year, month, 1) - (anchor or self.anchor)).days % self.period
+
+        # 1日目が位相0になるよう周期を回転させ、月末までタイル状に並べる
+        rotated = (self.cycle_mask >> phase) | (self.cycle_mask << (self.period - phase))
+        rotated &= (1 << self.period) - 1
+        mask = 0
+        for shift in range(0, days_in_month, self.period):
+            mask |= rotated << shift
+        return mask & ((1 << days_in_month) - 1)
+
+
+WORKING_PATTERNS: dict[str, WorkingPattern] = {
+    "weekdays": WorkingPattern.weekly([0, 1, 2, 3, 4]),
+    "tue-sat": WorkingPattern.weekly([1, 2, 3, 4, 5]),
+    "sun-thu": WorkingPattern.weekly([6, 0, 1, 2, 3]),
+    "4on3off": WorkingPattern.weekly([0, 1, 2, 3]),
+    "4on4off": WorkingPattern.rotating(4, 4, _MONDAY_ANCHOR),
+    "2on2off": WorkingPattern.rotating(2, 2, _MONDAY_ANCHOR),
+}
+
+
+def register_working_pattern(name: str, pattern: WorkingPattern) -> None:
+    """勤務パターンを登録（同名は置き換え、キャッシュは破棄）"""
+    WORKING_PATTERNS[name] = pattern
+    get_month_mask.cache_clear()
+
+
+@lru_cache(maxsize=4096)
+def get_month_mask(
+    pattern_name: str, year: int, month: int, start: date | None = None
+) -> int:
+    """勤務パターンの当月稼働日マスクを取得（(パターン, 勤務初日, 年, 月) ごとにキャッシュ）
+
+    Args:
+        start: 交替勤務の周期の勤務初日（省略時はパターン定義の基準日）。
+            班ごとに周期がずれる場合に指定する
+    """
+    try:
+        pattern = WORKING_PATTERNS[pattern_name]
+    except KeyError:
+        raise ValueError(f"Unknown working pattern: {pattern_name}") from None
+    if start is not None and not pattern.is_rotating:
+        raise ValueError(f"Working pattern {pattern_name} does not take a start date")
+    return pattern.month_mask(year, month, start)
+
+
+@lru_cache(maxsize=1024)
+def _weekday_mask(year: int, month: int, weekday: int) -> int:
+    """当月の指定曜日のマスク"""
+    return WorkingPattern.weekly([weekday]).month_mask(year, month)
+
+
+def count_working_days(
+    pattern_name: str, year: int, month: int, day: int, start: date | None = None
+) -> tuple[int, int]:
+    """経過稼働日数（昨日まで）と残り稼働日数（今日を含む）を取得"""
+    mask = get_month_mask(pattern_name, year, month, start)
+    elapsed = (mask & ((1 << (day - 1)) - 1)).bit_count()
+    remaining = (mask >> (day - 1)).bit_count()
+    return elapsed, remaining
+
+
+def remaining_weekday_counts(
+    pattern_name: str, year: int, month: int, day: int, start: date | None = None
+) -> list[int]:
+    """残り稼働日数（今日を含む）を曜日別に取得（インデックス: 月曜日=0 〜 日曜日=6）"""
+    remaining = get_month_mask(pattern_name, year, month, start) >> (day - 1) << (day - 1)
+    return [(remaining & _weekday_mask(year, month, w)).bit_count() for w in range(7)]
@@ -0,0 +1,229 @@
+"""Opt-in sampled profiling for MCP tool calls
+
+環境変数（起動時）または configure_profiling_tool（割合・サイズ上限のみ）で有効化すると、
+指定割合のツール呼び出しについて cProfile と tracemalloc を実行し、
+プロファイルと上位アロケーションの要約を出力する。
+
+    CHECK36_PROFILE_SAMPLE_RATE: サンプリング割合（0.0〜1.0、既定 0 = 無効）
+    CHECK36_PROFILE_DIR: 出力ディレクトリ（既定: 一時ディレクトリ配下の check36-profiles）
+    CHECK36_PROFILE_MAX_BYTES: 出力ディレクトリの合計サイズ上限（既定 50MB）
+"""
+
+import cProfile
+import functools
+import io
+import itertools
+import logging
+import os
+import pstats
+import random
+import re
+import tempfile
+import threading
+import time
+import tracemalloc
+from collections.abc import Callable
+from pathlib import Path
+from typing import Any, TypeVar
+
+ENV_SAMPLE_RATE = "CHECK36_PROFILE_SAMPLE_RATE"
+ENV_OUTPUT_DIR = "CHECK36_PROFILE_DIR"
+ENV_MAX_TOTAL_BYTES = "CHECK36_PROFILE_MAX_BYTES"
+
+DEFAULT_MAX_TOTAL_BYTES = 50 * 1024 * 1024
+TOP_ALLOCATIONS = 20
+
+# 出力ファイル名: <時刻>-<ツール名>-<PID>-<連番>.prof / .txt
+# ローテーションではこの形式のファイルだけを削除対象にする
+_TOOL_NAME_PATTERN = re.compile(r"^[A-Za-z0-9_]+$")
+_OUTPUT_FILE_PATTERN = re.compile(r"^\d{8}T\d{6}-[A-Za-z0-9_]+-\d+-\d{6}\.(?:prof|txt)$")
+
+logger = logging.getLogger(__name__)
+
+F = TypeVar("F", bound=Callable[..., Any])
+
+
+class SampledProfiler:
+    """サンプリング付きプロファイラー
+
+    cProfile と tracemalloc はプロセス全体で1つしか動かせないため、
+    計測中に別の呼び出しが来た場合はその呼び出しを計測対象から外す。
+    """
+
+    def __init__(
+        self,
+        sample_rate: float = 0.0,
+        output_dir: str | Path | None = None,
+        max_total_bytes: int = DEFAULT_MAX_TOTAL_BYTES,
+    ) -> None:
+        self.configure(sample_rate, output_dir, max_total_bytes)
+        self._lock = threading.Lock()
+        self._sequence = itertools.count()
+
+    @classmethod
+    def from_env(cls) -> "SampledProfiler":
+        """環境変数から設定を読み込む
+
+        不正な値はサーバーの起動を妨げないよう警告のみとし、無効（割合0）または既定値で代用する。
+        """
+        output_dir = os.environ.get(ENV_OUTPUT_DIR) or None
+
+        max_total_bytes = DEFAULT_MAX_TOTAL_BYTES
+        raw_max_bytes = os.environ.get(ENV_MAX_TOTAL_BYTES)
+        if raw_max_bytes:
+            try:
+                max_total_bytes = int(raw_max_bytes)
+                if max_total_bytes <= 0:
+                    raise ValueError("must be positive")
+            except ValueError:
+                logger.warning(
+                    "Ignoring invalid %s=%r; using %d",
+                    ENV_MAX_TOTAL_BYTES,
+                    raw_max_bytes,
+                    DEFAULT_MAX_TOTAL_BYTES,
+                )
+                max_total_bytes = DEFAULT_MAX_TOTAL_BYTES
+
+        sample_rate = 0.0
+        raw_sample_rate = os.environ.get(ENV_SAMPLE_RATE)
+        if raw_sample_rate:
+            try:
+                sample_rate = float(raw_sample_rate)
+                if not 0.0 <= sample_rate <= 1.0:
+                    raise ValueError("out of range")
+            except ValueError:
+                logger.warning(
+                    "Ignoring invalid %s=%r; profiling disabled", ENV_SAMPLE_RATE, raw_sample_rate
+                )
+                sample_rate = 0.0
+
+        return cls(sample_rate, output_dir, max_total_bytes)
+
+    def configure(
+        self,
+        sample_rate: float,
+        output_dir: str | Path | None = None,
+        max_total_bytes: int = DEFAULT_MAX_TOTAL_BYTES,
+    ) -> None:
+        """設定を変更"""
+        if not 0.0 <= sample_rate <= 1.0:
+            raise ValueError("sample_rate must be between 0.0 and 1.0")
+        if max_total_bytes <= 0:
+            raise ValueError("max_total_bytes must be positive")
+        self.sample_rate = sample_rate
+        self.output_dir = (
+            Path(output_dir)
+            if output_dir is not None
+            else Path(tempfile.gettempdir()) / "check36-profiles"
+        )
+        self.max_total_bytes = max_total_bytes
+
+    def settings(self) -> dict[str, Any]:
+        """現在の設定を返す"""
+        return {
+            "sampleRate": self.sample_rate,
+            "outputDir": str(self.output_dir),
+            "maxTotalBytes": self.max_total_bytes,
+        }
+
+    def wrap(self, name: str) -> Callable[[F], F]:
+        """関数をサンプリング計測の対象にするデコレーター
+
+        無効時は割合の比較1回のみで元の関数を呼び出す。
+        """
+        if not _TOOL_NAME_PATTERN.match(name):
+            raise ValueError("name must consist of letters, digits and underscores")
+
+        def decorator(func: F) -> F:
+            @functools.wraps(func)
+            def wrapper(*args: Any, **kwargs: Any) -> Any:
+                if self.sample_rate <= 0.0 or random.random() >= self.sample_rate:
+                    return func(*args, **kwargs)
+                if not self._lock.acquire(blocking=False):
+                    return func(*args, **kwargs)
+                try:
+                    return self._profile(name, func, args, kwargs)
+                finally:
+                    self._lock.release()
+
+            return wrapper  # type: ignore[return-value]
+
+        return decorator
+
+    def _profile(
+        self, name: str, func: Callable[..., Any], args: tuple, kwargs: dict[str, Any]
+    ) -> Any:
+        """cProfile と tracemalloc を実行して結果を出力"""
+        started_tracing = not tracemalloc.is_tracing()
+        if started_tracing:
+            tracemalloc.start()
+        profile = cProfile.Profile()
+        start = time.perf_counter()
+        try:
+            profile.enable()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                profile.disable()
+        finally:
+            elapsed = time.perf_counter() - start
+            snapshot = tracemalloc.take_snapshot()
+            _, peak = tracemalloc.get_traced_memory()
+            if started_tracing:
+                tracemalloc.stop()
+            # 計測結果の出力失敗で呼び出し自体を失敗させない
+            try:
+                self._dump(name, profile, snapshot, elapsed, peak)
+            except OSError:
+                logger.exception("Failed to write profile for %s to %s", name, self.output_dir)
+
+    def _dump(
+        self,
+        name: str,
+        profile: cProfile.Profile,
+        snapshot: tracemalloc.Snapshot,
+        elapsed: float,
+        peak: int,
+    ) -> None:
+        """プロファイルとアロケーション要約を書き出し、ローテーションする"""
+        self.output_dir.mkdir(parents=True, exist_ok=True)
+        stem = (
+            f"{time.strftime('%Y%m%dT%H%M%S')}-{name}-{os.getpid()}-{next(self._sequence):06d}"
+        )
+        profile.dump_stats(str(self.output_dir / f"{stem}.prof"))
+
+        summary = io.StringIO()
+        summary.write(f"tool: {name}\n")
+        summary.write(f"elapsed_seconds: {elapsed:.6f}\n")
+        summary.write(f"peak_traced_bytes: {peak}\n\n")
+        summary.write(f"top {TOP_ALLOCATIONS} allocations by line:\n")
+        for stat in snapshot.statistics("lineno")[:TOP_ALLOCATIONS]:
+            summary.write(f"{stat}\n")
+        summary.write("\ncumulative time:\n")
+        pstats.Stats(profile, stream=summary).sort_stats("cumulative").print_stats(20)
+        (self.output_dir / f"{stem}.txt").write_text(summary.getvalue(), encoding="utf-8")
+
+        self._rotate()
+
+    def _rotate(self) -> None:
+        """合計サイズが上限を超えた場合、古いファイルから削除
+
+        このプロファイラーの命名規則に一致するファイルだけを対象にする。
+        """
+        files = []
+        for entry in self.output_dir.iterdir():
+            if not _OUTPUT_FILE_PATTERN.match(entry.name) or not entry.is_file():
+                continue
+            stat = entry.stat()
+            files.append((stat.st_mtime, stat.st_size, entry))
+        files.sort(key=lambda item: (item[0], item[2].name))
+        total = sum(size for _, size, _ in files)
+        for _, size, path in files:
+            if total <= self.max_total_bytes:
+                break
+            path.unlink(missing_ok=True)
+            total -= size
+
+
+# サーバー全体で共有するプロファイラー
+profiler = SampledProfiler.from_env()
@@ -1,15 +1,55 @@
 """MCP Server entry point"""
 
+import argparse
+import functools
+import os
+from collections.abc import Awaitable, Callable
+from typing import Any
+
+import anyio.to_thread
 from fastmcp import FastMCP
 
-from .calculator import assess_current_month
-from .models import SimpleAssessmentOutput, SimpleInput
+from .calculator import assess_batch, assess_current_month
+from .models import DailyWorkEntry, DailyWorkRecord, SimpleAssessmentOutput, SimpleInput
+from .pace import PaceModel
+from .patterns import DEFAULT_WORKING_PATTERN
+from .profiling import DEFAULT_MAX_TOTAL_BYTES, profiler
+from .state import (
+    DEFAULT_SNAPSHOT_INTERVAL,
+    ENV_SNAPSHOT_INTERVAL,
+    ENV_STATE_DIR,
+    AssessmentStore,
+    SnapshotScheduler,
+)
+from .streaming import (
+    InputErrors,
+    OutputFormat,
+    open_writer,
+    read_ndjson_inputs,
+    write_results,
+)
+from .utils import get_current_date, parse_date
+
+# 従業員×月の集計（CHECK36_STATE_DIR 指定時は起動時に復元）
+store = AssessmentStore()
+
+TRANSPORTS = ("stdio", "http", "sse")
+DEFAULT_HOST = "127.0.0.1"
+DEFAULT_PORT = 8000
+
+
+def _offload(func: Callable[..., Any]) -> Callable[..., Awaitable[Any]]:
+    """CPUを使う評価処理をワーカースレッドで実行し、イベントループを塞がない"""
 
-# FastMCPインスタンス作成
-mcp = FastMCP("check36-mcp-server")
+    @functools.wraps(func)
+    async def wrapper(*args: Any, **kwargs: Any) -> Any:
+        return await anyio.to_thread.run_sync(functools.partial(func, *args, **kwargs))
 
+    return wrapper
 
-@mcp.tool()
+
+@_offload
+@profiler.wrap("assess_current_month_tool")
 def assess_current_month_tool(
     totalWorkHoursToDate: float,
     holidayWorkHoursToDate: float,
@@ -17,6 +57,10 @@ def assess_current_month_tool(
     workingDaysRemaining: int | None = None,
     currentDate: str | None = None,
     autoCalculateWeekdays: bool = True,
+    workingPattern: str = DEFAULT_WORKING_PATTERN,
+    workingPatternStart: str | None = None,
+    paceModel: PaceModel = "mean",
+    dailyRecords: list[DailyWorkEntry] | None = None,
 ) -> dict:
     """36協定の月次上限到達リスクを評価し、リカバリー策を提案
 
@@ -26,7 +70,13 @@ def assess_current_month_tool(
         workingDaysElapsed: 前日までに働いた日数（省略時は自動計算）
         workingDaysRemaining: 今日を含む残りの稼働日数（省略時は自動計算）
         currentDate: 評価基準日（YYYY-MM-DD形式、省略時は今日）
-        autoCalculateWeekdays: 土日を除外して自動計算するか（デフォルト: True）
+        autoCalculateWeekdays: 勤務パターンから稼働日数を自動計算するか（デフォルト: True）
+        workingPattern: 勤務パターン名（weekdays / tue-sat / sun-thu / 4on3off / 4on4off / 2on2off、
+            デフォルト: weekdays=月〜金）
+        workingPatternStart: 交替勤務（4on4off / 2on2off）の周期の勤務初日（YYYY-MM-DD形式、
+            省略時は 2024-01-01）
+        paceModel: 月末予測のペースモデル（mean / ewma / weekday / trailing、デフォルト: mean）
+        dailyRecords: 当月の日次労働時間（日付順、mean以外のペースモデルで使用）
 
     Returns:
         評価結果（45h上限・80h基準の評価とリカバリー提案）
@@ -39,6 +89,10 @@ def assess_current_month_tool(
         workingDaysRemaining=workingDaysRemaining,
         currentDate=currentDate,
         autoCalculateWeekdays=autoCalculateWeekdays,
+        workingPattern=workingPattern,
+        workingPatternStart=workingPatternStart,
+        paceModel=paceModel,
+        dailyRecords=dailyRecords,
     )
 
     # 評価実行
@@ -48,11 +102,231 @@ def assess_current_month_tool(
     return result.model_dump()
 
 
-def main() -> None:
+@_offload
+@profiler.wrap("assess_batch_tool")
+def assess_batch_tool(
+    inputPath: str,
+    outputPath: str,
+    outputFormat: OutputFormat = "ndjson",
+) -> dict:
+    """NDJSON形式の入力ファイルを一括評価し、結果をファイルへ逐次書き出す
+
+    Args:
+        inputPath: 入力ファイルパス（1行1件、SimpleInputの項目 + employeeId）
+        outputPath: 出力ファイルパス
+        outputFormat: 出力形式（ndjson / csv / columnar）
+
+    Returns:
+        出力件数と出力先、読み飛ばした行（不正な入力・評価できない入力）の件数と詳細（先頭100件まで）
+    """
+    errors = InputErrors()
+    with open(inputPath, encoding="utf-8") as source:
+        results = assess_batch(read_ndjson_inputs(source, errors), errors)
+        if outputFormat == "columnar":
+            with open(outputPath, "wb") as sink:
+                count = write_results(results, open_writer(outputFormat, sink))
+        else:
+            with open(outputPath, "w", encoding="utf-8", newline="") as sink:
+                count = write_results(results, open_writer(outputFormat, sink))
+
+    return {
+        "count": count,
+        "outputPath": outputPath,
+        "outputFormat": outputFormat,
+        "errorCount": errors.count,
+        "errors": errors.reported,
+    }
+
+
+def record_daily_work_tool(
+    employeeId: str,
+    date: str,
+    workHours: float,
+    holidayWorkHours: float = 0.0,
+) -> dict:
+    """従業員の日次労働実績を記録
+
+    Args:
+        employeeId: 従業員ID
+        date: 労働日（YYYY-MM-DD形式）
+        workHours: 総労働時間（休日労働を除く）
+        holidayWorkHours: 休日労働時間
+
+    Returns:
+        記録後の当月集計
+    """
+    record = DailyWorkRecord(
+        employeeId=employeeId,
+        date=date,
+        workHours=workHours,
+        holidayWorkHours=holidayWorkHours,
+    )
+    aggregate = store.record(record)
+
+    return {
+        "employeeId": employeeId,
+        "totalWorkHoursToDate": aggregate.total_work_hours,
+        "holidayWorkHoursToDate": aggregate.holiday_work_hours,
+        "daysRecorded": aggregate.days_recorded,
+    }
+
+
+@_offload
+@profiler.wrap("assess_employee_tool")
+def assess_employee_tool(
+    employeeId: str,
+    currentDate: str | None = None,
+    workingPattern: str = DEFAULT_WORKING_PATTERN,
+    workingPatternStart: str | None = None,
+    paceModel: PaceModel = "mean",
+) -> dict:
+    """記録済みの日次実績から従業員の当月リスクを評価
+
+    Args:
+        employeeId: 従業員ID
+        currentDate: 評価基準日（YYYY-MM-DD形式、省略時は今日）
+            基準日の前日までに記録済みの実績を累計とする（基準日以降の記録は含めない）
+        workingPattern: 勤務パターン名（デフォルト: weekdays=月〜金）
+        workingPatternStart: 交替勤務の周期の勤務初日（YYYY-MM-DD形式、省略時は 2024-01-01）
+        paceModel: 月末予測のペースモデル（mean / ewma / weekday / trailing、デフォルト: mean）
+
+    Returns:
+        評価結果（45h上限・80h基準の評価とリカバリー提案）
+    """
+    current_date_str = currentDate or get_current_date()
+    year, month, day = parse_date(current_date_str)
+    # 基準日以降の記録は「前日までの累計」に含めない
+    snapshot = store.snapshot_before(employeeId, year, month, day)
+    if snapshot is None:
+        raise ValueError(f"No records for employee {employeeId} in {year:04d}-{month:02d}")
+    total_work_hours, holiday_work_hours, pace_state = snapshot
+    input_data = SimpleInput(
+        totalWorkHoursToDate=total_work_hours,
+        holidayWorkHoursToDate=holiday_work_hours,
+        currentDate=current_date_str,
+        autoCalculateWeekdays=True,
+        workingPattern=workingPattern,
+        workingPatternStart=workingPatternStart,
+        paceModel=paceModel,
+    )
+
+    # 基準日以降の記録がなければ、記録時に逐次更新済みのペース状態（の複製）を使う
+    result: SimpleAssessmentOutput = assess_current_month(input_data, pace_state)
+    return result.model_dump()
+
+
+def configure_profiling_tool(
+    sampleRate: float,
+    maxTotalBytes: int = DEFAULT_MAX_TOTAL_BYTES,
+) -> dict:
+    """評価ツール呼び出しのサンプリングプロファイルを設定
+
+    出力ディレクトリは起動時の環境変数（CHECK36_PROFILE_DIR）でのみ指定できる。
+
+    Args:
+        sampleRate: 計測する呼び出しの割合（0.0〜1.0、0で無効）
+        maxTotalBytes: 出力ディレクトリの合計サイズ上限（超過分は古い順に削除）
+
+    Returns:
+        適用後の設定
+    """
+    profiler.configure(sampleRate, profiler.output_dir, maxTotalBytes)
+    return profiler.settings()
+
+
+def create_server(transport: str = "stdio", multi_worker: bool = False) -> FastMCP:
+    """トランスポートに応じたツール構成でサーバーを生成
+
+    - サーバー側のファイルパスを受け取るツールと設定変更ツールは stdio でのみ公開する
+      （ネットワーク経由では認証がなく、任意のファイルの読み書きや設定変更を許してしまうため）
+    - 集計を保持するツールは1プロセスの場合のみ公開する
+      （複数ワーカーでは呼び出しごとに別プロセスへ振り分けられ、集計が一致しないため）
+    """
+    tools: list[Callable[..., Any]] = [assess_current_month_tool]
+    if not multi_worker:
+        tools += [record_daily_work_tool, assess_employee_tool]
+    if transport == "stdio":
+        tools += [assess_batch_tool, configure_profiling_tool]
+
+    server = FastMCP("check36-mcp-server")
+    for tool in tools:
+        server.tool()(tool)
+    return server
+
+
+# FastMCPインスタンス作成（stdio 用の全ツール構成）
+mcp = create_server()
+
+
+def create_http_app() -> Any:
+    """複数ワーカー用のASGIアプリを生成（uvicorn の factory として各ワーカーで呼ばれる）
+
+    ワーカー間でセッションを共有できないため、ステートレスなHTTPとして公開する。
+    """
+    server = create_server("http", multi_worker=True)
+    return server.http_app(transport="http", stateless_http=True)
+
+
+def _parse_args(argv: list[str] | None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(prog="check36", description="36協定チェック用MCPサーバー")
+    parser.add_argument(
+        "--transport", choices=TRANSPORTS, default="stdio", help="トランスポート（既定: stdio）"
+    )
+    parser.add_argument("--host", default=DEFAULT_HOST, help="待受ホスト（http/sse）")
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT, help="待受ポート（http/sse）")
+    parser.add_argument(
+        "--workers", type=int, default=1, help="ワーカープロセス数（http のみ、既定: 1）"
+    )
+    args = parser.parse_args(argv)
+
+    if args.workers < 1:
+        parser.error("--workers must be at least 1")
+    if args.workers > 1:
+        if args.transport != "http":
+            parser.error("--workers > 1 requires --transport http")
+        if os.environ.get(ENV_STATE_DIR):
+            parser.error(f"--workers > 1 cannot be combined with {ENV_STATE_DIR}")
+    return args
+
+
+def _serve(args: argparse.Namespace) -> None:
+    """指定されたトランスポートでサーバーを実行"""
+    if args.transport == "stdio":
+        mcp.run()
+    elif args.workers > 1:
+        import uvicorn
+
+        uvicorn.run(
+            "check36.server:create_http_app",
+            factory=True,
+            host=args.host,
+            port=args.port,
+            workers=args.workers,
+        )
+    else:
+        server = create_server(args.transport)
+        server.run(transport=args.transport, host=args.host, port=args.port)
+
+
+def main(argv: list[str] | None = None) -> None:
     """MCPサーバーを起動"""
-    mcp.run()
+    args = _parse_args(argv)
+
+    state_dir = os.environ.get(ENV_STATE_DIR)
+    if not state_dir:
+        _serve(args)
+        return
+
+    # スナップショット＋ジャーナルから復元し、定期保存と終了時保存を行う
+    store.attach(state_dir)
+    interval = float(os.environ.get(ENV_SNAPSHOT_INTERVAL) or DEFAULT_SNAPSHOT_INTERVAL)
+    scheduler = SnapshotScheduler(store, interval)
+    scheduler.start()
+    try:
+        _serve(args)
+    finally:
+        scheduler.stop()
 
 
 if __name__ == "__main__":
     main()
-
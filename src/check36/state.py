@@ -0,0 +1,410 @@
+"""In-memory assessment state with journal and binary snapshots
+
+日次実績から従業員×月ごとの集計をメモリ上に保持する。
+実績は追記専用のジャーナル（NDJSON）に記録し、集計は定期的および終了時に
+バイナリスナップショットへ保存する。起動時はスナップショットを読み込み、
+ジャーナルのうちスナップショット以降（ウォーターマーク以降）の実績だけを再適用する。
+"""
+
+import json
+import logging
+import mmap
+import os
+import struct
+import threading
+from datetime import date
+from pathlib import Path
+
+from .models import DailyWorkRecord
+from .pace import PaceState
+
+ENV_STATE_DIR = "CHECK36_STATE_DIR"
+ENV_SNAPSHOT_INTERVAL = "CHECK36_SNAPSHOT_INTERVAL"
+
+DEFAULT_SNAPSHOT_INTERVAL = 300.0
+SNAPSHOT_FILENAME = "snapshot.bin"
+JOURNAL_FILENAME = "journal.ndjson"
+
+# スナップショット形式（リトルエンディアン）
+#   ヘッダー: magic(4) version(u16) ウォーターマーク=ジャーナルのバイト位置(u64) 件数(u32)
+#   エントリ: ID長(u16) ID(utf-8) 年(u16) 月(u8) 記録済みの日のマスク(u32)
+#             日別の総労働時間(f64×記録日数) 日別の休日労働時間(f64×記録日数)
+#             ペース状態: 件数(u16) 合計(f64) EWMA(f64) 曜日別合計(f64×7) 曜日別件数(u16×7)
+#                         直近N日の件数(u8) 直近N日の値(f64×件数)
+SNAPSHOT_MAGIC = b"C36S"
+SNAPSHOT_VERSION = 3
+_HEADER = struct.Struct("<4sHQI")
+_KEY_LENGTH = struct.Struct("<H")
+_ENTRY = struct.Struct("<HBI")
+_PACE = struct.Struct("<Hdd7d7HB")
+
+MonthKey = tuple[str, int, int]
+
+logger = logging.getLogger(__name__)
+
+
+class MonthlyAggregate:
+    """従業員1人・1か月分の集計
+
+    日ごとの実績は記録済みの日を表す31ビットのマスク（ビット d-1 が d日）と日別の値で保持する。
+    同じ日を再度記録した場合は差分を反映して置き換えるため、再送しても二重計上されない。
+    """
+
+    __slots__ = (
+        "year",
+        "month",
+        "recorded_mask",
+        "daily_work_hours",
+        "daily_holiday_work_hours",
+        "total_work_hours",
+        "holiday_work_hours",
+        "pace",
+    )
+
+    def __init__(self, year: int, month: int) -> None:
+        self.year = year
+        self.month = month
+        self.recorded_mask = 0
+        self.daily_work_hours = [0.0] * 31
+        self.daily_holiday_work_hours = [0.0] * 31
+        self.total_work_hours = 0.0
+        self.holiday_work_hours = 0.0
+        self.pace = PaceState()
+
+    @property
+    def days_recorded(self) -> int:
+        """記録済みの日数"""
+        return self.recorded_mask.bit_count()
+
+    @property
+    def last_date(self) -> date | None:
+        """最終記録日"""
+        if not self.recorded_mask:
+            return None
+        return date(self.year, self.month, self.recorded_mask.bit_length())
+
+    def set_day(self, day: int, work_hours: float, holiday_work_hours: float) -> None:
+        """1日分の実績を記録（記録済みの日は置き換え）"""
+        index = day - 1
+        bit = 1 << index
+        is_correction = bool(self.recorded_mask & bit)
+        is_latest = not is_correction and bit > self.recorded_mask
+
+        self.total_work_hours += work_hours - self.daily_work_hours[index]
+        self.holiday_work_hours += holiday_work_hours - self.daily_holiday_work_hours[index]
+        self.daily_work_hours[index] = work_hours
+        self.daily_holiday_work_hours[index] = holiday_work_hours
+        self.recorded_mask |= bit
+
+        if is_latest:
+            # 日付順の追記は O(1) で更新
+            self.pace.update(date(self.year, self.month, day).weekday(), work_hours)
+        else:
+            # 訂正・過去日の追記は日付順に組み直す（最大31日分）
+            self.pace = self.pace_before(32)
+
+    def totals_before(self, day: int) -> tuple[float, float]:
+        """指定日の前日までの (総労働時間, 休日労働時間)"""
+        if (self.recorded_mask >> (day - 1)) == 0:
+            return self.total_work_hours, self.holiday_work_hours
+        days = self.recorded_days(day)
+        return (
+            sum(self.daily_work_hours[d - 1] for d in days),
+            sum(self.daily_holiday_work_hours[d - 1] for d in days),
+        )
+
+    def pace_before(self, day: int) -> PaceState:
+        """指定日の前日までの実績によるペース状態"""
+        if day <= 31 and (self.recorded_mask >> (day - 1)) == 0:
+            return self.pace
+        pace = PaceState()
+        for d in self.recorded_days(min(day, 32)):
+            pace.update(date(self.year, self.month, d).weekday(), self.daily_work_hours[d - 1])
+        return pace
+
+    def recorded_days(self, before_day: int = 32) -> list[int]:
+        """指定日より前の記録済みの日（昇順、省略時は全日）"""
+        mask = self.recorded_mask & ((1 << (before_day - 1)) - 1)
+        return [d for d in range(1, before_day) if mask >> (d - 1) & 1]
+
+
+class AssessmentStore:
+    """従業員×月の集計ストア
+
+    state_dir を指定しない場合はメモリ上のみで動作する（ジャーナル・スナップショットなし）。
+    """
+
+    def __init__(self) -> None:
+        self._aggregates: dict[MonthKey, MonthlyAggregate] = {}
+        self._lock = threading.RLock()
+        self._state_dir: Path | None = None
+        self._journal_offset = 0
+
+    @property
+    def state_dir(self) -> Path | None:
+        return self._state_dir
+
+    @property
+    def watermark(self) -> int:
+        """集計に反映済みのジャーナル位置（バイト）"""
+        return self._journal_offset
+
+    def __len__(self) -> int:
+        return len(self._aggregates)
+
+    def attach(self, state_dir: str | Path) -> None:
+        """状態ディレクトリを割り当て、スナップショットとジャーナルから復元"""
+        with self._lock:
+            self._state_dir = Path(state_dir)
+            self._state_dir.mkdir(parents=True, exist_ok=True)
+            self._aggregates.clear()
+            self._journal_offset = 0
+            snapshot_path = self._state_dir / SNAPSHOT_FILENAME
+            if snapshot_path.exists():
+                try:
+                    self.load_snapshot(snapshot_path)
+                except ValueError:
+                    # 形式の異なる（旧バージョン等の）スナップショットは使わず、全件を再適用する
+                    self._aggregates.clear()
+                    self._journal_offset = 0
+            self.replay_journal()
+
+            # 書き込み途中で終了した末尾の行は破棄し、以降の追記位置を揃える
+            journal_path = self._state_dir / JOURNAL_FILENAME
+            if journal_path.exists() and journal_path.stat().st_size > self._journal_offset:
+                os.truncate(journal_path, self._journal_offset)
+
+    def record(self, record: DailyWorkRecord) -> MonthlyAggregate:
+        """実績をジャーナルへ追記し、集計に反映（同じ従業員・日付は置き換え）"""
+        # 適用できない実績はジャーナルへ書く前に弾く（再起動時の再適用を妨げないため）
+        record_date = date.fromisoformat(record.date)
+        with self._lock:
+            if self._state_dir is not None:
+                line = record.model_dump_json() + "\n"
+                with open(self._state_dir / JOURNAL_FILENAME, "ab") as journal:
+                    journal.write(line.encode("utf-8"))
+                    self._journal_offset = journal.tell()
+            return self._apply(record, record_date)
+
+    def get(self, employee_id: str, year: int, month: int) -> MonthlyAggregate | None:
+        """集計を取得（未記録ならNone）"""
+        with self._lock:
+            return self._aggregates.get((employee_id, year, month))
+
+    def snapshot_before(
+        self, employee_id: str, year: int, month: int, day: int
+    ) -> tuple[float, float, PaceState] | None:
+        """指定日の前日までの (総労働時間, 休日労働時間, ペース状態) を取得（未記録ならNone）
+
+        同時に記録されても累計とペースが食い違わないよう、ロック内で取得し
+        ペース状態は複製を返す。
+        """
+        with self._lock:
+            aggregate = self._aggregates.get((employee_id, year, month))
+            if aggregate is None:
+                return None
+            total_work_hours, holiday_work_hours = aggregate.totals_before(day)
+            pace = aggregate.pace_before(day)
+            if pace is aggregate.pace:
+                pace = pace.copy()
+            return total_work_hours, holiday_work_hours, pace
+
+    def _apply(self, record: DailyWorkRecord, record_date: date) -> MonthlyAggregate:
+        key = (record.employeeId, record_date.year, record_date.month)
+        aggregate = self._aggregates.get(key)
+        if aggregate is None:
+            aggregate = MonthlyAggregate(record_date.year, record_date.month)
+            self._aggregates[key] = aggregate
+        aggregate.set_day(record_date.day, record.workHours, record.holidayWorkHours)
+        return aggregate
+
+    def replay_journal(self) -> int:
+        """ウォーターマーク以降のジャーナルを再適用し、適用件数を返す
+
+        末尾の改行で終わらない行（書き込み途中）は適用しない。
+        解釈できない行は警告を出して読み飛ばす（1行のために起動できなくならないよう）。
+        """
+        if self._state_dir is None:
+            return 0
+        journal_path = self._state_dir / JOURNAL_FILENAME
+        if not journal_path.exists():
+            return 0
+
+        applied = 0
+        with self._lock, open(journal_path, "rb") as journal:
+            journal.seek(self._journal_offset)
+            for line in journal:
+                if not line.endswith(b"\n"):
+                    break
+                line_offset = self._journal_offset
+                self._journal_offset += len(line)
+                if not line.strip():
+                    continue
+                try:
+                    record = DailyWorkRecord(**json.loads(line))
+                    record_date = date.fromisoformat(record.date)
+                except (ValueError, TypeError) as e:
+                    logger.warning(
+                        "Skipping invalid journal line at byte %d of %s: %s",
+                        line_offset,
+                        journal_path,
+                        e,
+                    )
+                    continue
+                self._apply(record, record_date)
+                applied += 1
+        return applied
+
+    def save_snapshot(self, path: str | Path | None = None) -> Path:
+        """集計をスナップショットへ保存（一時ファイル経由で置き換え）"""
+        target = Path(path) if path is not None else self._default_snapshot_path()
+        with self._lock:
+            buffer = bytearray(
+                _HEADER.pack(
+                    SNAPSHOT_MAGIC, SNAPSHOT_VERSION, self._journal_offset, len(self._aggregates)
+                )
+            )
+            for (employee_id, year, month), aggregate in self._aggregates.items():
+                encoded = employee_id.encode("utf-8")
+                buffer += _KEY_LENGTH.pack(len(encoded))
+                buffer += encoded
+                days = aggregate.recorded_days()
+                buffer += _ENTRY.pack(year, month, aggregate.recorded_mask)
+                buffer += struct.pack(
+                    f"<{2 * len(days)}d",
+                    *(aggregate.daily_work_hours[d - 1] for d in days),
+                    *(aggregate.daily_holiday_work_hours[d - 1] for d in days),
+                )
+                buffer += _encode_pace(aggregate.pace)
+
+        temporary = target.with_name(target.name + ".tmp")
+        with open(temporary, "wb") as snapshot:
+            snapshot.write(buffer)
+            snapshot.flush()
+            os.fsync(snapshot.fileno())
+        os.replace(temporary, target)
+        return target
+
+    def load_snapshot(self, path: str | Path) -> None:
+        """スナップショットを読み込む（可能ならmmapを使用）"""
+        with open(path, "rb") as snapshot:
+            try:
+                data: bytes | mmap.mmap = mmap.mmap(
+                    snapshot.fileno(), 0, access=mmap.ACCESS_READ
+                )
+            except (OSError, ValueError):
+                data = snapshot.read()
+            try:
+                aggregates, offset = _decode_snapshot(data)
+            finally:
+                if isinstance(data, mmap.mmap):
+                    data.close()
+
+        with self._lock:
+            self._aggregates = aggregates
+            self._journal_offset = offset
+
+    def _default_snapshot_path(self) -> Path:
+        if self._state_dir is None:
+            raise ValueError("State directory is not attached")
+        return self._state_dir / SNAPSHOT_FILENAME
+
+
+def _decode_snapshot(data: bytes | mmap.mmap) -> tuple[dict[MonthKey, MonthlyAggregate], int]:
+    """スナップショットをデコード"""
+    if len(data) < _HEADER.size:
+        raise ValueError("Truncated snapshot")
+    magic, version, offset, count = _HEADER.unpack_from(data, 0)
+    if magic != SNAPSHOT_MAGIC:
+        raise ValueError("Not a check36 snapshot")
+    if version != SNAPSHOT_VERSION:
+        raise ValueError(f"Unsupported snapshot version: {version}")
+
+    aggregates: dict[MonthKey, MonthlyAggregate] = {}
+    position = _HEADER.size
+    try:
+        for _ in range(count):
+            (key_length,) = _KEY_LENGTH.unpack_from(data, position)
+            position += _KEY_LENGTH.size
+            employee_id = bytes(data[position : position + key_length]).decode("utf-8")
+            position += key_length
+            year, month, recorded_mask = _ENTRY.unpack_from(data, position)
+            position += _ENTRY.size
+            aggregate = MonthlyAggregate(year, month)
+            aggregate.recorded_mask = recorded_mask
+            days = aggregate.recorded_days()
+            values = struct.unpack_from(f"<{2 * len(days)}d", data, position)
+            position += 16 * len(days)
+            for i, d in enumerate(days):
+                aggregate.daily_work_hours[d - 1] = values[i]
+                aggregate.daily_holiday_work_hours[d - 1] = values[len(days) + i]
+            aggregate.total_work_hours = sum(values[: len(days)])
+            aggregate.holiday_work_hours = sum(values[len(days) :])
+            aggregate.pace, position = _decode_pace(data, position)
+            aggregates[(employee_id, year, month)] = aggregate
+    except struct.error as e:
+        raise ValueError("Truncated snapshot") from e
+    return aggregates, offset
+
+
+def _encode_pace(pace: PaceState) -> bytes:
+    """ペース状態をエンコード（EWMA係数・直近日数は既定値のため保存しない）"""
+    window = list(pace.window)
+    return _PACE.pack(
+        pace.count,
+        pace.total,
+        pace.ewma,
+        *pace.weekday_totals,
+        *pace.weekday_counts,
+        len(window),
+    ) + struct.pack(f"<{len(window)}d", *window)
+
+
+def _decode_pace(data: bytes | mmap.mmap, position: int) -> tuple[PaceState, int]:
+    """ペース状態をデコードし、次の読み込み位置とともに返す"""
+    values = _PACE.unpack_from(data, position)
+    position += _PACE.size
+    window_length = values[-1]
+    window = struct.unpack_from(f"<{window_length}d", data, position)
+    position += 8 * window_length
+
+    pace = PaceState()
+    pace.count, pace.total, pace.ewma = values[0], values[1], values[2]
+    pace.weekday_totals = list(values[3:10])
+    pace.weekday_counts = list(values[10:17])
+    pace.window.extend(window)
+    pace.window_total = sum(window)
+    return pace, position
+
+
+class SnapshotScheduler:
+    """一定間隔でスナップショットを保存するバックグラウンドスレッド"""
+
+    def __init__(self, store: AssessmentStore, interval: float = DEFAULT_SNAPSHOT_INTERVAL) -> None:
+        if interval <= 0:
+            raise ValueError("interval must be positive")
+        self._store = store
+        self._interval = interval
+        self._stop = threading.Event()
+        self._thread: threading.Thread | None = None
+
+    def start(self) -> None:
+        """定期保存を開始"""
+        if self._thread is not None:
+            return
+        self._thread = threading.Thread(
+            target=self._run, name="check36-snapshot", daemon=True
+        )
+        self._thread.start()
+
+    def stop(self) -> None:
+        """定期保存を停止し、最終スナップショットを保存"""
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+        self._store.save_snapshot()
+
+    def _run(self) -> None:
+        while not self._stop.wait(self._interval):
+            self._store.save_snapshot()
@@ -0,0 +1,303 @@
+"""Streaming input readers and result writers for batch evaluation
+
+評価結果を1件ずつ書き出すことで、従業員数に関わらずメモリ使用量を一定に保つ。
+出力形式は NDJSON / CSV（評価項目をフラット化）/ 列指向バイナリの3種類。
+"""
+
+import csv
+import json
+import struct
+import sys
+from array import array
+from collections.abc import Iterable, Iterator
+from typing import IO, Any, BinaryIO, Literal, TextIO
+
+from .models import SimpleAssessmentOutput, SimpleInput
+
+OutputFormat = Literal["ndjson", "csv", "columnar"]
+
+# 評価ブロックと、フラット化する LimitAssessment のスカラー項目
+EVALUATION_KEYS = ("evaluation45", "evaluation80")
+LIMIT_NUMERIC_FIELDS = (
+    "limit",
+    "totalWorkHoursToDate",
+    "projectedTotalWorkHours",
+    "projectedOvertimeAndHolidayHours",
+    "remainingToLimit",
+)
+RISK_LEVELS = ("OK", "WARN", "LIMIT")
+
+# 列指向バイナリ形式
+COLUMNAR_MAGIC = b"C36C"
+COLUMNAR_VERSION = 1
+DEFAULT_ROW_GROUP_SIZE = 1024
+
+# 列の型コード（s: 文字列, d: float64, b: リスクレベル（uint8コード））
+_COLUMN_TYPES: list[tuple[str, str]] = [("employeeId", "s")]
+for _key in EVALUATION_KEYS:
+    _COLUMN_TYPES.extend((f"{_key}.{field}", "d") for field in LIMIT_NUMERIC_FIELDS)
+    _COLUMN_TYPES.append((f"{_key}.riskLevel", "b"))
+
+FLAT_COLUMNS = [name for name, _ in _COLUMN_TYPES]
+
+
+def flatten_result(employee_id: str, result: SimpleAssessmentOutput) -> dict[str, Any]:
+    """評価結果を1行分のフラットな辞書に変換（リカバリー選択肢は含まない）"""
+    row: dict[str, Any] = {"employeeId": employee_id}
+    for key in EVALUATION_KEYS:
+        evaluation = getattr(result, key)
+        for field in LIMIT_NUMERIC_FIELDS:
+            row[f"{key}.{field}"] = getattr(evaluation, field)
+        row[f"{key}.riskLevel"] = evaluation.riskLevel
+    return row
+
+
+class InputErrors:
+    """読み飛ばした不正な入力行の記録（保持する詳細は先頭 max_reported 件まで）
+
+    line_no は直近に読み込んだ（評価中の）入力の行番号で、評価時のエラーの記録に使う。
+    """
+
+    def __init__(self, max_reported: int = 100) -> None:
+        self.count = 0
+        self.max_reported = max_reported
+        self.reported: list[dict[str, Any]] = []
+        self.line_no = 0
+
+    def add(self, line_no: int, message: str) -> None:
+        self.count += 1
+        if len(self.reported) < self.max_reported:
+            self.reported.append({"line": line_no, "message": message})
+
+
+def read_ndjson_inputs(
+    stream: TextIO, errors: InputErrors | None = None
+) -> Iterator[tuple[str, SimpleInput]]:
+    """NDJSON形式の入力を1行ずつ読み込む
+
+    各行は SimpleInput の項目に加えて `employeeId` を持つ（省略時は行番号）。
+
+    Args:
+        stream: 入力ストリーム
+        errors: 指定時は不正な行を読み飛ばして記録する。
+            省略時は不正な行で行番号付きの ValueError を送出する
+    """
+    for line_no, line in enumerate(stream, start=1):
+        line = line.strip()
+        if not line:
+            continue
+        try:
+            record = json.loads(line)
+            if not isinstance(record, dict):
+                raise ValueError("Input line must be a JSON object")
+            employee_id = str(record.pop("employeeId", line_no))
+            input_data = SimpleInput(**record)
+        except (ValueError, TypeError) as e:
+            if errors is None:
+                raise ValueError(f"Invalid input at line {line_no}: {e}") from e
+            errors.add(line_no, str(e))
+            continue
+        if errors is not None:
+            errors.line_no = line_no
+        yield employee_id, input_data
+
+
+class ResultWriter:
+    """評価結果ライターの基底クラス"""
+
+    def write(self, employee_id: str, result: SimpleAssessmentOutput) -> None:
+        """1件書き出す"""
+        raise NotImplementedError
+
+    def close(self) -> None:
+        """バッファ済みの内容を書き出す（ストリーム自体は閉じない）"""
+
+    def __enter__(self) -> "ResultWriter":
+        return self
+
+    def __exit__(self, *exc_info: object) -> None:
+        self.close()
+
+
+class NdjsonWriter(ResultWriter):
+    """NDJSON形式（1行1結果、リカバリー選択肢を含む完全な出力）"""
+
+    def __init__(self, stream: TextIO) -> None:
+        self._stream = stream
+
+    def write(self, employee_id: str, result: SimpleAssessmentOutput) -> None:
+        record = {"employeeId": employee_id, **result.model_dump()}
+        self._stream.write(json.dumps(record, ensure_ascii=False))
+        self._stream.write("\n")
+
+    def close(self) -> None:
+        self._stream.flush()
+
+
+class CsvWriter(ResultWriter):
+    """CSV形式（evaluation45/evaluation80 をフラット化した列）"""
+
+    def __init__(self, stream: TextIO) -> None:
+        self._stream = stream
+        self._writer = csv.DictWriter(stream, fieldnames=FLAT_COLUMNS)
+        self._writer.writeheader()
+
+    def write(self, employee_id: str, result: SimpleAssessmentOutput) -> None:
+        self._writer.writerow(flatten_result(employee_id, result))
+
+    def close(self) -> None:
+        self._stream.flush()
+
+
+class ColumnarWriter(ResultWriter):
+    """列指向バイナリ形式
+
+    レイアウト（すべてリトルエンディアン）:
+        ヘッダー: magic(4) version(u16) 列数(u16) [名前長(u16) 名前(utf-8) 型(u8)]...
+        行グループ: 行数(u32) 続いて列ごとのデータ
+            d: float64 × 行数
+            b: uint8 × 行数
+            s: オフセット u32 × (行数+1) + utf-8 バイト列
+
+    行グループ単位でしか保持しないため、バッファは row_group_size 行に制限される。
+    """
+
+    def __init__(self, stream: BinaryIO, row_group_size: int = DEFAULT_ROW_GROUP_SIZE) -> None:
+        if row_group_size <= 0:
+            raise ValueError("row_group_size must be positive")
+        self._stream = stream
+        self._row_group_size = row_group_size
+        self._columns: list[list[Any]] = [[] for _ in _COLUMN_TYPES]
+        self._rows = 0
+        self._write_header()
+
+    def _write_header(self) -> None:
+        header = bytearray(COLUMNAR_MAGIC)
+        header += struct.pack("<HH", COLUMNAR_VERSION, len(_COLUMN_TYPES))
+        for name, type_code in _COLUMN_TYPES:
+            encoded = name.encode("utf-8")
+            header += struct.pack("<H", len(encoded)) + encoded + type_code.encode("ascii")
+        self._stream.write(bytes(header))
+
+    def write(self, employee_id: str, result: SimpleAssessmentOutput) -> None:
+        row = flatten_result(employee_id, result)
+        for column, name in zip(self._columns, FLAT_COLUMNS):
+            column.append(row[name])
+        self._rows += 1
+        if self._rows >= self._row_group_size:
+            self._flush_row_group()
+
+    def _flush_row_group(self) -> None:
+        if self._rows == 0:
+            return
+        self._stream.write(struct.pack("<I", self._rows))
+        for (_, type_code), values in zip(_COLUMN_TYPES, self._columns):
+            self._stream.write(_encode_column(type_code, values))
+            values.clear()
+        self._rows = 0
+
+    def close(self) -> None:
+        self._flush_row_group()
+        self._stream.flush()
+
+
+def _encode_column(type_code: str, values: list[Any]) -> bytes:
+    """1列分の値をバイト列にエンコード"""
+    if type_code == "d":
+        return _to_little_endian(array("d", values))
+    if type_code == "b":
+        return bytes(RISK_LEVELS.index(v) for v in values)
+    encoded = [v.encode("utf-8") for v in values]
+    offsets = array("I", [0])
+    for item in encoded:
+        offsets.append(offsets[-1] + len(item))
+    return _to_little_endian(offsets) + b"".join(encoded)
+
+
+def _to_little_endian(values: array) -> bytes:
+    if sys.byteorder != "little":
+        values = array(values.typecode, values)
+        values.byteswap()
+    return values.tobytes()
+
+
+def _read_exact(stream: BinaryIO, size: int) -> bytes:
+    data = stream.read(size)
+    if len(data) != size:
+        raise ValueError("Truncated columnar stream")
+    return data
+
+
+def _read_array(stream: BinaryIO, typecode: str, count: int) -> array:
+    values = array(typecode)
+    values.frombytes(_read_exact(stream, values.itemsize * count))
+    if sys.byteorder != "little":
+        values.byteswap()
+    return values
+
+
+def read_columnar(stream: BinaryIO) -> Iterator[dict[str, Any]]:
+    """列指向バイナリ形式を行グループ単位で読み込み、1行ずつ返す"""
+    if _read_exact(stream, 4) != COLUMNAR_MAGIC:
+        raise ValueError("Not a columnar result stream")
+    version, column_count = struct.unpack("<HH", _read_exact(stream, 4))
+    if version != COLUMNAR_VERSION:
+        raise ValueError(f"Unsupported columnar version: {version}")
+
+    columns: list[tuple[str, str]] = []
+    for _ in range(column_count):
+        (name_len,) = struct.unpack("<H", _read_exact(stream, 2))
+        name = _read_exact(stream, name_len).decode("utf-8")
+        type_code = _read_exact(stream, 1).decode("ascii")
+        columns.append((name, type_code))
+
+    while True:
+        prefix = stream.read(4)
+        if not prefix:
+            return
+        if len(prefix) != 4:
+            raise ValueError("Truncated columnar stream")
+        (rows,) = struct.unpack("<I", prefix)
+
+        decoded: list[list[Any]] = []
+        for _, type_code in columns:
+            if type_code == "d":
+                decoded.append(list(_read_array(stream, "d", rows)))
+            elif type_code == "b":
+                decoded.append([RISK_LEVELS[c] for c in _read_exact(stream, rows)])
+            else:
+                offsets = _read_array(stream, "I", rows + 1)
+                blob = _read_exact(stream, offsets[-1])
+                decoded.append(
+                    [blob[offsets[i] : offsets[i + 1]].decode("utf-8") for i in range(rows)]
+                )
+
+        names = [name for name, _ in columns]
+        for i in range(rows):
+            yield {name: values[i] for name, values in zip(names, decoded)}
+
+
+def open_writer(output_format: OutputFormat, stream: IO[Any]) -> ResultWriter:
+    """出力形式に対応するライターを生成
+
+    columnar はバイナリストリーム、それ以外はテキストストリームを渡すこと。
+    """
+    if output_format == "ndjson":
+        return NdjsonWriter(stream)
+    if output_format == "csv":
+        return CsvWriter(stream)
+    if output_format == "columnar":
+        return ColumnarWriter(stream)
+    raise ValueError(f"Unsupported output format: {output_format}")
+
+
+def write_results(
+    results: Iterable[tuple[str, SimpleAssessmentOutput]], writer: ResultWriter
+) -> int:
+    """評価結果を逐次書き出し、件数を返す"""
+    count = 0
+    with writer:
+        for employee_id, result in results:
+            writer.write(employee_id, result)
+            count += 1
+    return count
@@ -1,7 +1,9 @@
 """Utility functions for date and time calculations"""
 
 import calendar
-from datetime import datetime, timedelta
+from datetime import datetime
+
+from .patterns import DEFAULT_WORKING_PATTERN, count_working_days
 
 
 def get_days_in_month(year: int, month: int) -> int:
@@ -43,17 +45,14 @@ def count_weekdays(start_date: str, end_date: str) -> int:
     
     if start > end:
         return 0
-    
-    weekday_count = 0
-    current = start
-    
-    while current <= end:
-        # 月曜日=0, 日曜日=6
-        if current.weekday() < 5:  # 月〜金（0-4）
-            weekday_count += 1
-        current += timedelta(days=1)
-    
-    return weekday_count
+
+    # 丸ごとの週は5日ずつ、端数の日は曜日（月曜日=0, 日曜日=6）で判定
+    total_days = (end - start).days + 1
+    full_weeks, extra_days = divmod(total_days, 7)
+    start_weekday = start.weekday()
+    extra_weekdays = sum(1 for i in range(extra_days) if (start_weekday + i) % 7 < 5)
+
+    return full_weeks * 5 + extra_weekdays
 
 
 def get_remaining_weekdays_in_month(current_date: str) -> int:
@@ -66,12 +65,7 @@ def get_remaining_weekdays_in_month(current_date: str) -> int:
         今日を含む当月末までの平日数
     """
     year, month, day = parse_date(current_date)
-    days_in_month = get_days_in_month(year, month)
-    
-    # 月末日を取得
-    end_of_month = f"{year:04d}-{month:02d}-{days_in_month:02d}"
-    
-    return count_weekdays(current_date, end_of_month)
+    return count_working_days(DEFAULT_WORKING_PATTERN, year, month, day)[1]
 
 
 def get_elapsed_weekdays_in_month(current_date: str) -> int:
@@ -84,18 +78,4 @@ def get_elapsed_weekdays_in_month(current_date: str) -> int:
         月初から昨日までの平日数
     """
     year, month, day = parse_date(current_date)
-    
-    if day == 1:
-        # 月初の場合は0
-        return 0
-    
-    # 月初日を取得
-    start_of_month = f"{year:04d}-{month:02d}-01"
-    
-    # 昨日の日付を取得
-    current = datetime.strptime(current_date, "%Y-%m-%d")
-    yesterday = current - timedelta(days=1)
-    yesterday_str = yesterday.strftime("%Y-%m-%d")
-    
-    return count_weekdays(start_of_month, yesterday_str)
-
+    return count_working_days(DEFAULT_WORKING_PATTERN, year, month, day)[0]
@@ -0,0 +1,61 @@
+"""Tests for the load generator summary"""
+
+import asyncio
+import socket
+
+import pytest
+
+from check36.loadgen import percentile, run_load, summarize
+
+
+class TestPercentile:
+    """percentile関数のテスト"""
+
+    def test_nearest_rank(self):
+        """最近傍順位法で百分位を求める"""
+        values = [float(i) for i in range(1, 101)]
+        assert percentile(values, 50) == 50.0
+        assert percentile(values, 99) == 99.0
+        assert percentile(values, 100) == 100.0
+
+    def test_small_and_empty(self):
+        """件数が少ない場合・空の場合"""
+        assert percentile([0.5], 99) == 0.5
+        assert percentile([], 50) == 0.0
+
+
+class TestSummarize:
+    """summarize関数のテスト"""
+
+    def test_summary_fields(self):
+        """スループットとレイテンシ（ミリ秒）を集計"""
+        summary = summarize([0.003, 0.001, 0.002, 0.010], elapsed=2.0, errors=1)
+        assert summary["requests"] == 5
+        assert summary["succeeded"] == 4
+        assert summary["errors"] == 1
+        assert summary["throughputPerSecond"] == 2.0
+        assert summary["p50Ms"] == pytest.approx(2.0)
+        assert summary["p99Ms"] == pytest.approx(10.0)
+        assert summary["maxMs"] == pytest.approx(10.0)
+
+    def test_no_successes(self):
+        """成功0件でもエラーにならない"""
+        summary = summarize([], elapsed=0.0, errors=3)
+        assert summary["throughputPerSecond"] == 0.0
+        assert summary["maxMs"] == 0.0
+
+
+class TestRunLoad:
+    """run_load関数のテスト"""
+
+    def test_unreachable_server_still_summarizes(self):
+        """接続できなくても例外にせず、エラーとして集計する"""
+        with socket.socket() as sock:
+            sock.bind(("127.0.0.1", 0))
+            port = sock.getsockname()[1]
+
+        summary = asyncio.run(run_load(f"http://127.0.0.1:{port}/mcp", concurrency=2, requests=5))
+        assert summary["sessionErrors"] == 2
+        assert summary["succeeded"] == 0
+        assert summary["errors"] == 5
+        assert summary["requests"] == 5
@@ -0,0 +1,176 @@
+"""Tests for incremental pace models"""
+
+import pytest
+from pydantic import ValidationError
+
+from check36.calculator import assess_current_month, build_pace_state
+from check36.models import DailyWorkEntry, SimpleInput
+from check36.pace import PaceState
+
+
+class TestPaceState:
+    """PaceStateのテスト"""
+
+    def test_no_records_uses_default(self):
+        """実績がなければ既定値（8時間）"""
+        state = PaceState()
+        assert state.daily_pace("mean") == 8.0
+        assert state.daily_pace("ewma") == 8.0
+
+    def test_ewma_weights_recent_days(self):
+        """EWMA: 直近の実績ほど重い"""
+        state = PaceState(alpha=0.5)
+        for hours in (8.0, 8.0, 12.0):
+            state.update(0, hours)
+        assert state.daily_pace("mean") == pytest.approx(28.0 / 3)
+        assert state.daily_pace("ewma") == pytest.approx(10.0)
+
+    def test_trailing_window(self):
+        """直近N日: 古い実績は窓から外れる"""
+        state = PaceState(trailing_days=2)
+        for hours in (6.0, 8.0, 10.0, 12.0):
+            state.update(0, hours)
+        assert state.daily_pace("trailing") == pytest.approx(11.0)
+        assert state.window_total == pytest.approx(22.0)
+
+    def test_weekday_projection(self):
+        """曜日別: 残り稼働日の曜日構成で積み上げ、未記録の曜日は累計平均"""
+        state = PaceState()
+        state.update(0, 12.0)  # 月
+        state.update(1, 8.0)  # 火
+        remaining = [2, 1, 1, 0, 0, 0, 0]
+        # 月2日×12h + 火1日×8h + 水1日×累計平均10h
+        assert state.project_remaining_hours("weekday", 4, remaining) == pytest.approx(42.0)
+        assert state.project_remaining_hours("weekday", 4) == pytest.approx(40.0)
+
+    def test_copy_is_independent(self):
+        """複製への更新は元の状態に影響しない"""
+        state = PaceState(trailing_days=2)
+        for hours in (8.0, 10.0):
+            state.update(0, hours)
+        clone = state.copy()
+        clone.update(1, 14.0)
+
+        assert state.daily_pace("trailing") == 9.0
+        assert state.weekday_counts[1] == 0
+        assert clone.daily_pace("trailing") == 12.0
+        assert clone.count == 3
+
+    def test_invalid_parameters(self):
+        """不正なパラメーターはエラー"""
+        with pytest.raises(ValueError):
+            PaceState(alpha=0.0)
+        with pytest.raises(ValueError):
+            PaceState(trailing_days=0)
+
+
+def _records() -> list[DailyWorkEntry]:
+    # 2025-10-01(水)〜: 前半は8h、直近1週間は12h
+    days = [1, 2, 3, 6, 7, 8, 9, 10, 13, 14, 15, 16, 17]
+    return [
+        DailyWorkEntry(date=f"2025-10-{d:02d}", workHours=12.0 if d >= 13 else 8.0)
+        for d in days
+    ]
+
+
+def _input(pace_model: str, **kwargs) -> SimpleInput:
+    records = _records()
+    return SimpleInput(
+        totalWorkHoursToDate=sum(r.workHours for r in records),
+        holidayWorkHoursToDate=0.0,
+        currentDate="2025-10-20",
+        paceModel=pace_model,
+        dailyRecords=records,
+        **kwargs,
+    )
+
+
+class TestAssessWithPaceModel:
+    """assess_current_month のペースモデル選択"""
+
+    def test_mean_is_default_and_recorded(self):
+        """既定はmeanで、適用ルールに記録される"""
+        result = assess_current_month(_input("mean"))
+        assert result.references["appliedRules"][-1] == "予測モデル: 累計平均ペース（mean）"
+
+    @pytest.mark.parametrize("pace_model", ["ewma", "weekday", "trailing"])
+    def test_recent_heavy_week_raises_projection(self, pace_model):
+        """直近が重い場合、mean以外のモデルは予測が大きくなる"""
+        mean = assess_current_month(_input("mean"))
+        other = assess_current_month(_input(pace_model))
+        assert (
+            other.evaluation45.projectedTotalWorkHours
+            > mean.evaluation45.projectedTotalWorkHours
+        )
+        assert f"（{pace_model}）" in other.references["appliedRules"][-1]
+
+    def test_trailing_projection(self):
+        """直近5日の平均12hで残り稼働日を予測"""
+        result = assess_current_month(_input("trailing"))
+        # 10/20〜10/31 の平日は10日
+        assert result.evaluation45.projectedTotalWorkHours == pytest.approx(124.0 + 10 * 12.0)
+
+    def test_config_parameters(self):
+        """config.pace で直近日数を変更できる"""
+        config = {"pace": {"trailingDays": 13}}
+        result = assess_current_month(_input("trailing", config=config))
+        assert result.evaluation45.projectedTotalWorkHours == pytest.approx(
+            124.0 + 10 * 124.0 / 13
+        )
+
+    @pytest.mark.parametrize(
+        "pace",
+        [
+            {"ewmaAlpha": 0},
+            {"ewmaAlpha": 1.5},
+            {"trailingDays": 0},
+            {"trailingDays": 1.5},
+        ],
+    )
+    def test_invalid_config_parameters(self, pace):
+        """範囲外・非整数の設定は入力検証でエラー"""
+        with pytest.raises(ValidationError):
+            _input("ewma", config={"pace": pace})
+
+    def test_nonexistent_record_date_is_rejected(self):
+        """暦にない日付の日次実績は入力検証でエラー"""
+        with pytest.raises(ValidationError):
+            DailyWorkEntry(date="2025-10-32", workHours=8.0)
+
+    def test_records_outside_window_are_ignored(self):
+        """他の月・基準日以降の日次実績は予測に使わない"""
+        extra = [
+            DailyWorkEntry(date="2025-09-30", workHours=20.0),
+            DailyWorkEntry(date="2025-10-20", workHours=20.0),
+            DailyWorkEntry(date="2025-10-24", workHours=20.0),
+            DailyWorkEntry(date="2025-11-03", workHours=20.0),
+        ]
+        for pace_model in ("ewma", "weekday", "trailing"):
+            expected = assess_current_month(_input(pace_model))
+            input_data = _input(pace_model)
+            input_data.dailyRecords = extra[:1] + input_data.dailyRecords + extra[1:]
+            assert assess_current_month(input_data) == expected
+
+    def test_weekday_with_manual_days_records_mean(self):
+        """稼働日数の手動入力ではweekdayを累計平均で代用し、そのとおり記録する"""
+        manual = {
+            "autoCalculateWeekdays": False,
+            "workingDaysElapsed": 13,
+            "workingDaysRemaining": 10,
+        }
+        weekday = assess_current_month(_input("weekday", **manual))
+        mean = assess_current_month(_input("mean", **manual))
+        assert weekday == mean
+        assert weekday.references["appliedRules"][-1] == "予測モデル: 累計平均ペース（mean）"
+
+    def test_without_records_falls_back_to_mean(self):
+        """日次実績がなければmeanで代用"""
+        input_data = _input("ewma").model_copy(update={"dailyRecords": None})
+        result = assess_current_month(input_data)
+        assert "（mean）" in result.references["appliedRules"][-1]
+
+    def test_prebuilt_state_matches_records(self):
+        """逐次更新済みの状態を渡しても同じ結果"""
+        input_data = _input("ewma")
+        state = build_pace_state(input_data.dailyRecords, input_data)
+        assert assess_current_month(input_data, state) == assess_current_month(input_data)
@@ -0,0 +1,155 @@
+"""Tests for working-pattern bitmasks"""
+
+from datetime import date
+
+import pytest
+
+from check36.calculator import assess_current_month
+from check36.models import SimpleInput
+from check36.patterns import (
+    WORKING_PATTERNS,
+    WorkingPattern,
+    count_working_days,
+    get_month_mask,
+    register_working_pattern,
+    remaining_weekday_counts,
+)
+
+
+class TestMonthMask:
+    """月次マスクのテスト"""
+
+    def test_weekdays_october_2025(self):
+        """2025年10月（水曜日始まり）の月〜金"""
+        mask = get_month_mask("weekdays", 2025, 10)
+        assert mask.bit_count() == 23
+        assert mask & 1  # 10/1 (水)
+        assert not mask & (1 << 3)  # 10/4 (土)
+        assert mask >> 31 == 0
+
+    def test_tue_sat(self):
+        """火〜土: 土曜日を含み月曜日を含まない"""
+        mask = get_month_mask("tue-sat", 2025, 10)
+        assert mask & (1 << 3)  # 10/4 (土)
+        assert not mask & (1 << 5)  # 10/6 (月)
+
+    def test_rotating_pattern_across_months(self):
+        """交替勤務: 月をまたいでも周期が続く"""
+        pattern = WorkingPattern.rotating(4, 4, date(2025, 9, 29))
+        # 9/29〜10/2 勤務、10/3〜10/6 休み、10/7〜 勤務
+        assert pattern.month_mask(2025, 10) & 0b1111111 == 0b1000011
+        assert pattern.month_mask(2025, 9) >> 28 == 0b11
+
+    def test_mask_is_cached(self):
+        """同じ (パターン, 月) は1回だけ計算"""
+        get_month_mask.cache_clear()
+        for _ in range(1000):
+            get_month_mask("weekdays", 2025, 10)
+        info = get_month_mask.cache_info()
+        assert (info.misses, info.hits) == (1, 999)
+
+    def test_rotating_start_is_part_of_cache_key(self):
+        """勤務初日の異なる班は別々のマスクとしてキャッシュ"""
+        get_month_mask.cache_clear()
+        crew_a = get_month_mask("4on4off", 2025, 10, date(2025, 9, 29))
+        crew_b = get_month_mask("4on4off", 2025, 10, date(2025, 10, 3))
+        assert crew_a == WorkingPattern.rotating(4, 4, date(2025, 9, 29)).month_mask(2025, 10)
+        assert crew_a & crew_b == 0  # 4勤4休の2班は勤務日が重ならない
+        get_month_mask("4on4off", 2025, 10, date(2025, 9, 29))
+        info = get_month_mask.cache_info()
+        assert (info.misses, info.hits) == (2, 1)
+
+    def test_start_rejected_for_weekly_pattern(self):
+        """曜日固定のパターンには勤務初日を指定できない"""
+        with pytest.raises(ValueError):
+            get_month_mask("weekdays", 2025, 10, date(2025, 10, 1))
+
+    def test_unknown_pattern(self):
+        """未登録のパターンはエラー"""
+        with pytest.raises(ValueError):
+            get_month_mask("no-such-pattern", 2025, 10)
+
+    def test_invalid_pattern_definition(self):
+        """不正な定義はエラー"""
+        with pytest.raises(ValueError):
+            WorkingPattern.weekly([7])
+        with pytest.raises(ValueError):
+            WorkingPattern.rotating(0, 3, date(2025, 1, 1))
+
+
+class TestCountWorkingDays:
+    """count_working_days関数のテスト"""
+
+    def test_matches_weekday_counts(self):
+        """weekdays は従来の平日計算と一致"""
+        # 2025-10-25 (土): 昨日までの平日18日、残り平日5日
+        assert count_working_days("weekdays", 2025, 10, 25) == (18, 5)
+        assert count_working_days("weekdays", 2025, 10, 1) == (0, 23)
+
+    def test_tue_sat_counts(self):
+        """火〜土の経過・残り日数"""
+        # 2025-10-20 (月): 10/1〜10/19 の火〜土は 4+5+5=14日、10/20〜10/31 は 5+4=9日
+        assert count_working_days("tue-sat", 2025, 10, 20) == (14, 9)
+
+    def test_remaining_weekday_counts(self):
+        """残り稼働日の曜日別日数"""
+        assert remaining_weekday_counts("tue-sat", 2025, 10, 20) == [0, 2, 2, 2, 2, 1, 0]
+
+    def test_register_custom_pattern(self):
+        """独自パターンを登録できる"""
+        register_working_pattern("mon-wed-fri", WorkingPattern.weekly([0, 2, 4]))
+        try:
+            assert count_working_days("mon-wed-fri", 2025, 10, 1) == (0, 14)
+        finally:
+            del WORKING_PATTERNS["mon-wed-fri"]
+            get_month_mask.cache_clear()
+
+
+class TestAssessWithWorkingPattern:
+    """assess_current_month の勤務パターン指定"""
+
+    def test_pattern_changes_remaining_days(self):
+        """勤務パターンによって残り稼働日数が変わる"""
+        base = {
+            "totalWorkHoursToDate": 140.0,
+            "holidayWorkHoursToDate": 0.0,
+            "currentDate": "2025-10-20",
+        }
+        weekdays = assess_current_month(SimpleInput(**base))
+        four_on = assess_current_month(SimpleInput(**base, workingPattern="4on3off"))
+        # 4on3off は残り稼働日が少ないが1日あたりのペースは高い
+        assert "残り10日間" in weekdays.evaluation45.recoveryOptions[0].description
+        assert "残り8日間" in four_on.evaluation45.recoveryOptions[0].description
+
+    def test_unknown_pattern_rejected(self):
+        """未登録のパターン名は入力エラー"""
+        with pytest.raises(ValueError):
+            SimpleInput(totalWorkHoursToDate=0.0, holidayWorkHoursToDate=0.0, workingPattern="x")
+
+    def test_pattern_start_shifts_rotation(self):
+        """勤務初日の指定で班ごとの経過・残り稼働日数が変わる"""
+        base = {
+            "totalWorkHoursToDate": 100.0,
+            "holidayWorkHoursToDate": 0.0,
+            "currentDate": "2025-10-20",
+            "workingPattern": "4on4off",
+        }
+        # A班: 9/29 勤務初日 → 10/1-2, 7-10, 15-18 が経過、23-26, 31 が残り
+        crew_a = assess_current_month(SimpleInput(**base, workingPatternStart="2025-09-29"))
+        # B班: 10/3 勤務初日 → 10/3-6, 11-14, 19 が経過、20-22, 27-30 が残り
+        crew_b = assess_current_month(SimpleInput(**base, workingPatternStart="2025-10-03"))
+        assert "残り5日間" in crew_a.evaluation45.recoveryOptions[0].description
+        assert "残り7日間" in crew_b.evaluation45.recoveryOptions[0].description
+
+    @pytest.mark.parametrize(
+        ("pattern", "start"), [("weekdays", "2025-10-01"), ("4on4off", "2025-02-30")]
+    )
+    def test_invalid_pattern_start_rejected(self, pattern, start):
+        """曜日固定のパターンへの指定・存在しない日付は入力エラー"""
+        with pytest.raises(ValueError):
+            SimpleInput(
+                totalWorkHoursToDate=0.0,
+                holidayWorkHoursToDate=0.0,
+                workingPattern=pattern,
+                workingPatternStart=start,
+            )
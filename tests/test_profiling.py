@@ -0,0 +1,125 @@
+"""Tests for sampled profiling"""
+
+import pytest
+
+from check36.profiling import DEFAULT_MAX_TOTAL_BYTES, SampledProfiler
+
+
+def _work(n: int) -> int:
+    return sum(len(str(i)) for i in range(n))
+
+
+class TestSampledProfiler:
+    """SampledProfilerのテスト"""
+
+    def test_disabled_writes_nothing(self, tmp_path):
+        """無効時はファイルを出力しない"""
+        profiler = SampledProfiler(sample_rate=0.0, output_dir=tmp_path)
+        wrapped = profiler.wrap("work")(_work)
+
+        assert wrapped(100) == _work(100)
+        assert list(tmp_path.iterdir()) == []
+
+    def test_sampled_call_dumps_profile_and_summary(self, tmp_path):
+        """計測時はプロファイルと要約を出力"""
+        profiler = SampledProfiler(sample_rate=1.0, output_dir=tmp_path)
+        wrapped = profiler.wrap("work")(_work)
+
+        assert wrapped(1000) == _work(1000)
+        suffixes = sorted(p.suffix for p in tmp_path.iterdir())
+        assert suffixes == [".prof", ".txt"]
+
+        summary = next(tmp_path.glob("*.txt")).read_text(encoding="utf-8")
+        assert "tool: work" in summary
+        assert "allocations" in summary
+
+    def test_rotation_caps_total_size(self, tmp_path):
+        """合計サイズ上限を超えた分は古い順に削除"""
+        profiler = SampledProfiler(sample_rate=1.0, output_dir=tmp_path)
+        wrapped = profiler.wrap("work")(_work)
+        wrapped(10)
+        single_call_bytes = sum(p.stat().st_size for p in tmp_path.iterdir())
+
+        profiler.configure(1.0, tmp_path, max_total_bytes=single_call_bytes * 2)
+        for _ in range(5):
+            wrapped(10)
+
+        total = sum(p.stat().st_size for p in tmp_path.iterdir())
+        assert total <= single_call_bytes * 2
+        assert len(list(tmp_path.glob("*.prof"))) < 6
+
+    def test_exception_still_dumps(self, tmp_path):
+        """例外時も計測結果を出力し、例外はそのまま送出"""
+        profiler = SampledProfiler(sample_rate=1.0, output_dir=tmp_path)
+
+        @profiler.wrap("fail")
+        def fail() -> None:
+            raise RuntimeError("boom")
+
+        with pytest.raises(RuntimeError):
+            fail()
+        assert len(list(tmp_path.glob("*.prof"))) == 1
+
+    def test_from_env(self, monkeypatch, tmp_path):
+        """環境変数から設定を読み込む"""
+        monkeypatch.setenv("CHECK36_PROFILE_SAMPLE_RATE", "0.25")
+        monkeypatch.setenv("CHECK36_PROFILE_DIR", str(tmp_path))
+        monkeypatch.setenv("CHECK36_PROFILE_MAX_BYTES", "1024")
+
+        profiler = SampledProfiler.from_env()
+        assert profiler.settings() == {
+            "sampleRate": 0.25,
+            "outputDir": str(tmp_path),
+            "maxTotalBytes": 1024,
+        }
+
+    def test_rotation_keeps_foreign_files(self, tmp_path):
+        """ローテーションは自身が出力したファイルだけを削除"""
+        (tmp_path / "notes.txt").write_text("keep", encoding="utf-8")
+        (tmp_path / "report.prof").write_text("keep", encoding="utf-8")
+        profiler = SampledProfiler(sample_rate=1.0, output_dir=tmp_path, max_total_bytes=1)
+        wrapped = profiler.wrap("work")(_work)
+
+        wrapped(10)
+        wrapped(10)
+
+        assert sorted(p.name for p in tmp_path.iterdir()) == ["notes.txt", "report.prof"]
+
+    def test_dump_failure_does_not_fail_call(self, tmp_path):
+        """出力先に書き込めなくても呼び出しは成功"""
+        blocker = tmp_path / "afile"
+        blocker.write_text("", encoding="utf-8")
+        profiler = SampledProfiler(sample_rate=1.0, output_dir=blocker / "sub")
+
+        assert profiler.wrap("work")(lambda: 42)() == 42
+
+    @pytest.mark.parametrize(
+        ("rate", "max_bytes", "expected_rate", "expected_max"),
+        [
+            ("abc", "1024", 0.0, 1024),
+            ("1.5", "1024", 0.0, 1024),
+            ("0.5", "lots", 0.5, DEFAULT_MAX_TOTAL_BYTES),
+            ("0.5", "-1", 0.5, DEFAULT_MAX_TOTAL_BYTES),
+        ],
+    )
+    def test_from_env_invalid_values(
+        self, monkeypatch, caplog, rate, max_bytes, expected_rate, expected_max
+    ):
+        """不正な環境変数は警告して無効・既定値で代用"""
+        monkeypatch.setenv("CHECK36_PROFILE_SAMPLE_RATE", rate)
+        monkeypatch.setenv("CHECK36_PROFILE_MAX_BYTES", max_bytes)
+
+        profiler = SampledProfiler.from_env()
+        assert profiler.sample_rate == expected_rate
+        assert profiler.max_total_bytes == expected_max
+        assert "Ignoring invalid" in caplog.text
+
+    def test_invalid_tool_name(self):
+        """ファイル名に使えないツール名はエラー"""
+        with pytest.raises(ValueError):
+            SampledProfiler().wrap("../evil")
+
+    def test_invalid_sample_rate(self):
+        """割合の範囲外はエラー"""
+        with pytest.raises(ValueError):
+            SampledProfiler(sample_rate=1.5)
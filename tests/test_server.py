@@ -0,0 +1,104 @@
+"""Tests for server tools and command-line options"""
+
+import asyncio
+
+import pytest
+from fastmcp import Client
+
+from check36.server import _parse_args, create_server, mcp
+
+
+def _call(tool: str, arguments: dict) -> dict:
+    async def call() -> dict:
+        async with Client(mcp) as client:
+            result = await client.call_tool(tool, arguments)
+            return result.structured_content
+
+    return asyncio.run(call())
+
+
+def _tool_names(server) -> set[str]:
+    async def list_names() -> set[str]:
+        async with Client(server) as client:
+            return {tool.name for tool in await client.list_tools()}
+
+    return asyncio.run(list_names())
+
+
+class TestCreateServer:
+    """create_server のツール構成"""
+
+    def test_stdio_exposes_all_tools(self):
+        """stdioでは全ツールを公開"""
+        assert _tool_names(mcp) == {
+            "assess_current_month_tool",
+            "assess_batch_tool",
+            "record_daily_work_tool",
+            "assess_employee_tool",
+            "configure_profiling_tool",
+        }
+
+    @pytest.mark.parametrize("transport", ["http", "sse"])
+    def test_network_hides_file_and_configuration_tools(self, transport):
+        """ネットワーク経由ではファイルパス・設定変更ツールを公開しない"""
+        assert _tool_names(create_server(transport)) == {
+            "assess_current_month_tool",
+            "record_daily_work_tool",
+            "assess_employee_tool",
+        }
+
+    def test_multi_worker_hides_stateful_tools(self):
+        """複数ワーカーでは集計を保持するツールも公開しない"""
+        assert _tool_names(create_server("http", multi_worker=True)) == {
+            "assess_current_month_tool"
+        }
+
+
+class TestEmployeeTools:
+    """record_daily_work_tool / assess_employee_tool のテスト"""
+
+    def test_retry_is_not_double_counted(self):
+        """同じ日の再送は置き換え"""
+        arguments = {"employeeId": "retry-1", "date": "2025-10-01", "workHours": 9.0}
+        _call("record_daily_work_tool", arguments)
+        result = _call("record_daily_work_tool", arguments)
+        assert result["totalWorkHoursToDate"] == 9.0
+        assert result["daysRecorded"] == 1
+
+    def test_records_on_or_after_current_date_are_excluded(self):
+        """基準日以降の記録は前日までの累計に含めない"""
+        for day in range(1, 11):
+            _call(
+                "record_daily_work_tool",
+                {"employeeId": "future-1", "date": f"2025-10-{day:02d}", "workHours": 10.0},
+            )
+        assessed = _call(
+            "assess_employee_tool", {"employeeId": "future-1", "currentDate": "2025-10-06"}
+        )
+        assert assessed["evaluation45"]["totalWorkHoursToDate"] == 50.0
+
+
+class TestParseArgs:
+    """_parse_args関数のテスト"""
+
+    def test_defaults_to_stdio(self):
+        """既定はstdio・1ワーカー"""
+        args = _parse_args([])
+        assert args.transport == "stdio"
+        assert args.workers == 1
+
+    def test_http_with_workers(self):
+        """httpでは複数ワーカーを指定できる"""
+        args = _parse_args(["--transport", "http", "--port", "9000", "--workers", "4"])
+        assert (args.transport, args.port, args.workers) == ("http", 9000, 4)
+
+    def test_workers_require_http(self):
+        """複数ワーカーはhttp以外では使えない"""
+        with pytest.raises(SystemExit):
+            _parse_args(["--transport", "sse", "--workers", "2"])
+
+    def test_workers_reject_state_dir(self, monkeypatch, tmp_path):
+        """複数ワーカーと状態ディレクトリは併用できない"""
+        monkeypatch.setenv("CHECK36_STATE_DIR", str(tmp_path))
+        with pytest.raises(SystemExit):
+            _parse_args(["--transport", "http", "--workers", "2"])
@@ -0,0 +1,259 @@
+"""Tests for assessment state snapshots"""
+
+from datetime import date
+
+import pytest
+from pydantic import ValidationError
+
+from check36.models import DailyWorkRecord
+from check36.pace import PaceState
+from check36.state import (
+    JOURNAL_FILENAME,
+    SNAPSHOT_FILENAME,
+    AssessmentStore,
+    SnapshotScheduler,
+)
+
+
+def _record(employee_id: str, day: str, hours: float, holiday: float = 0.0) -> DailyWorkRecord:
+    return DailyWorkRecord(
+        employeeId=employee_id, date=day, workHours=hours, holidayWorkHours=holiday
+    )
+
+
+class TestAssessmentStore:
+    """AssessmentStoreのテスト"""
+
+    def test_in_memory_aggregation(self):
+        """状態ディレクトリなしでも集計できる"""
+        store = AssessmentStore()
+        store.record(_record("E1", "2025-10-01", 9.0))
+        store.record(_record("E1", "2025-10-02", 10.0, holiday=2.0))
+        store.record(_record("E1", "2025-11-01", 8.0))
+
+        aggregate = store.get("E1", 2025, 10)
+        assert aggregate is not None
+        assert aggregate.total_work_hours == 19.0
+        assert aggregate.holiday_work_hours == 2.0
+        assert aggregate.days_recorded == 2
+        assert aggregate.last_date == date(2025, 10, 2)
+        assert store.get("E2", 2025, 10) is None
+
+    def test_restart_replays_journal(self, tmp_path):
+        """スナップショットなしでもジャーナルから復元"""
+        store = AssessmentStore()
+        store.attach(tmp_path)
+        store.record(_record("E1", "2025-10-01", 9.0))
+        store.record(_record("E1", "2025-10-02", 10.0))
+
+        restarted = AssessmentStore()
+        restarted.attach(tmp_path)
+        assert restarted.get("E1", 2025, 10).total_work_hours == 19.0
+        assert restarted.watermark == (tmp_path / JOURNAL_FILENAME).stat().st_size
+
+    def test_snapshot_then_replay_only_newer_records(self, tmp_path):
+        """スナップショット以降の実績のみ再適用"""
+        store = AssessmentStore()
+        store.attach(tmp_path)
+        store.record(_record("E1", "2025-10-01", 9.0))
+        store.record(_record("社員2", "2025-10-01", 7.5, holiday=1.0))
+        store.save_snapshot()
+        watermark = store.watermark
+        store.record(_record("E1", "2025-10-02", 11.0))
+
+        restarted = AssessmentStore()
+        restarted.load_snapshot(tmp_path / SNAPSHOT_FILENAME)
+        assert restarted.watermark == watermark
+        assert restarted.get("E1", 2025, 10).total_work_hours == 9.0
+
+        restarted.attach(tmp_path)
+        assert restarted.get("E1", 2025, 10).total_work_hours == 20.0
+        assert restarted.get("E1", 2025, 10).last_date == date(2025, 10, 2)
+        assert restarted.get("社員2", 2025, 10).holiday_work_hours == 1.0
+
+    def test_partial_journal_line_is_discarded(self, tmp_path):
+        """書き込み途中の末尾行は適用せず切り詰める"""
+        store = AssessmentStore()
+        store.attach(tmp_path)
+        store.record(_record("E1", "2025-10-01", 9.0))
+        with open(tmp_path / JOURNAL_FILENAME, "ab") as journal:
+            journal.write(b'{"employeeId": "E1", "da')
+
+        restarted = AssessmentStore()
+        restarted.attach(tmp_path)
+        assert restarted.get("E1", 2025, 10).days_recorded == 1
+
+        restarted.record(_record("E1", "2025-10-02", 8.0))
+        again = AssessmentStore()
+        again.attach(tmp_path)
+        assert again.get("E1", 2025, 10).total_work_hours == 17.0
+
+    def test_same_day_is_replaced_not_added(self):
+        """同じ日の再記録は置き換え（再送で二重計上しない）"""
+        store = AssessmentStore()
+        store.record(_record("E1", "2025-10-01", 9.0))
+        store.record(_record("E1", "2025-10-01", 9.0))
+        aggregate = store.get("E1", 2025, 10)
+        assert aggregate.total_work_hours == 9.0
+        assert aggregate.days_recorded == 1
+        assert aggregate.pace.count == 1
+
+        store.record(_record("E1", "2025-10-01", 7.0, holiday=1.0))
+        assert aggregate.total_work_hours == 7.0
+        assert aggregate.holiday_work_hours == 1.0
+        assert aggregate.pace.daily_pace("mean") == 7.0
+
+    def test_out_of_order_records_keep_date_order_pace(self):
+        """過去日の追記・訂正後もペースは日付順の実績と一致"""
+        store = AssessmentStore()
+        for day, hours in ((1, 8.0), (3, 12.0), (2, 10.0), (6, 9.0), (3, 11.0)):
+            store.record(_record("E1", f"2025-10-{day:02d}", hours))
+        pace = store.get("E1", 2025, 10).pace
+
+        expected = PaceState()
+        for day, hours in ((1, 8.0), (2, 10.0), (3, 11.0), (6, 9.0)):
+            expected.update(date(2025, 10, day).weekday(), hours)
+        for model in ("mean", "ewma", "trailing"):
+            assert pace.daily_pace(model) == pytest.approx(expected.daily_pace(model))
+
+    def test_totals_and_pace_before_day(self):
+        """指定日の前日までの累計・ペース"""
+        store = AssessmentStore()
+        for day, hours in ((1, 8.0), (2, 10.0), (3, 12.0)):
+            store.record(_record("E1", f"2025-10-{day:02d}", hours, holiday=1.0))
+        aggregate = store.get("E1", 2025, 10)
+
+        assert aggregate.totals_before(3) == (18.0, 2.0)
+        assert aggregate.totals_before(4) == (30.0, 3.0)
+        assert aggregate.pace_before(3).count == 2
+        assert aggregate.pace_before(4) is aggregate.pace
+
+    def test_nonexistent_date_is_rejected(self):
+        """暦にない日付は入力検証でエラー"""
+        with pytest.raises(ValidationError):
+            _record("E1", "2025-02-30", 8.0)
+
+    def test_unappliable_record_is_not_journaled(self, tmp_path):
+        """適用できない実績はジャーナルへ書かない"""
+        store = AssessmentStore()
+        store.attach(tmp_path)
+        store.record(_record("E1", "2025-10-01", 9.0))
+        bad = DailyWorkRecord.model_construct(
+            employeeId="E1", date="2025-02-30", workHours=8.0, holidayWorkHours=0.0
+        )
+        with pytest.raises(ValueError):
+            store.record(bad)
+
+        restarted = AssessmentStore()
+        restarted.attach(tmp_path)
+        assert restarted.get("E1", 2025, 10).total_work_hours == 9.0
+        assert restarted.watermark == store.watermark
+
+    def test_invalid_journal_line_is_skipped(self, tmp_path, caplog):
+        """解釈できないジャーナル行は読み飛ばして起動を続ける"""
+        store = AssessmentStore()
+        store.attach(tmp_path)
+        store.record(_record("E1", "2025-10-01", 9.0))
+        with open(tmp_path / JOURNAL_FILENAME, "ab") as journal:
+            journal.write(b'{"employeeId": "E1", "date": "2025-02-30", "workHours": 8.0}\n')
+            journal.write(b"not json\n")
+        store.record(_record("E1", "2025-10-02", 10.0))
+
+        restarted = AssessmentStore()
+        restarted.attach(tmp_path)
+        assert restarted.get("E1", 2025, 10).total_work_hours == 19.0
+        assert restarted.get("E1", 2025, 2) is None
+        assert caplog.text.count("Skipping invalid journal line") == 2
+
+    def test_snapshot_before_is_detached(self):
+        """取得した累計・ペースは以降の記録の影響を受けない"""
+        store = AssessmentStore()
+        store.record(_record("E1", "2025-10-01", 8.0, holiday=1.0))
+        store.record(_record("E1", "2025-10-02", 10.0))
+
+        total, holiday, pace = store.snapshot_before("E1", 2025, 10, 3)
+        store.record(_record("E1", "2025-10-03", 14.0))
+        store.record(_record("E1", "2025-10-02", 12.0))
+
+        assert (total, holiday) == (18.0, 1.0)
+        assert pace.count == 2
+        assert pace.daily_pace("mean") == 9.0
+        assert store.snapshot_before("E1", 2025, 10, 3)[0] == 20.0
+        assert store.snapshot_before("E2", 2025, 10, 3) is None
+
+    def test_invalid_snapshot(self, tmp_path):
+        """不正なスナップショットはエラー"""
+        path = tmp_path / SNAPSHOT_FILENAME
+        path.write_bytes(b"XXXX" + b"\0" * 20)
+        with pytest.raises(ValueError):
+            AssessmentStore().load_snapshot(path)
+
+
+class TestSnapshotScheduler:
+    """SnapshotSchedulerのテスト"""
+
+    def test_stop_saves_final_snapshot(self, tmp_path):
+        """停止時にスナップショットを保存"""
+        store = AssessmentStore()
+        store.attach(tmp_path)
+        store.record(_record("E1", "2025-10-01", 9.0))
+
+        scheduler = SnapshotScheduler(store, interval=3600)
+        scheduler.start()
+        scheduler.stop()
+
+        restarted = AssessmentStore()
+        restarted.load_snapshot(tmp_path / SNAPSHOT_FILENAME)
+        assert restarted.get("E1", 2025, 10).total_work_hours == 9.0
+
+
+class TestPaceSnapshot:
+    """ペース状態のスナップショット"""
+
+    def test_pace_state_survives_restart(self, tmp_path):
+        """ペース状態も保存・復元される"""
+        store = AssessmentStore()
+        store.attach(tmp_path)
+        for day, hours in ((1, 8.0), (2, 9.0), (3, 12.0), (6, 11.0), (7, 10.0), (8, 13.0)):
+            store.record(_record("E1", f"2025-10-{day:02d}", hours))
+        store.record(_record("E1", "2025-10-03", 9.5))
+        store.save_snapshot()
+        original = store.get("E1", 2025, 10).pace
+
+        restarted = AssessmentStore()
+        restarted.load_snapshot(tmp_path / SNAPSHOT_FILENAME)
+        pace = restarted.get("E1", 2025, 10).pace
+        for model in ("mean", "ewma", "trailing"):
+            assert pace.daily_pace(model) == pytest.approx(original.daily_pace(model))
+        assert pace.weekday_counts == original.weekday_counts
+        assert list(pace.window) == list(original.window)
+        aggregate = restarted.get("E1", 2025, 10)
+        assert aggregate.total_work_hours == pytest.approx(8 + 9 + 9.5 + 11 + 10 + 13)
+        assert aggregate.days_recorded == 6
+        assert aggregate.last_date == date(2025, 10, 8)
+
+        # 復元後も訂正（置き換え）と逐次更新を続けられる
+        for record in (_record("E1", "2025-10-08", 12.0), _record("E1", "2025-10-09", 10.0)):
+            restarted.record(record)
+            store.record(record)
+        assert aggregate.total_work_hours == pytest.approx(8 + 9 + 9.5 + 11 + 10 + 12 + 10)
+        for model in ("mean", "ewma", "trailing"):
+            assert aggregate.pace.daily_pace(model) == pytest.approx(
+                store.get("E1", 2025, 10).pace.daily_pace(model)
+            )
+
+    def test_old_snapshot_version_replays_full_journal(self, tmp_path):
+        """旧バージョンのスナップショットは使わず全件を再適用"""
+        store = AssessmentStore()
+        store.attach(tmp_path)
+        store.record(_record("E1", "2025-10-01", 9.0))
+        store.save_snapshot()
+        path = tmp_path / SNAPSHOT_FILENAME
+        data = bytearray(path.read_bytes())
+        data[4:6] = (1).to_bytes(2, "little")
+        path.write_bytes(bytes(data))
+
+        restarted = AssessmentStore()
+        restarted.attach(tmp_path)
+        assert restarted.get("E1", 2025, 10).total_work_hours == 9.0
+        assert restarted.get("E1", 2025, 10).pace.count == 1
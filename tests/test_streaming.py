@@ -0,0 +1,239 @@
+"""Tests for streaming readers and writers"""
+
+import asyncio
+import csv
+import io
+import json
+
+import pytest
+from fastmcp import Client
+
+from check36.calculator import assess_batch, assess_current_month
+from check36.models import SimpleInput
+from check36.server import mcp
+from check36.streaming import (
+    FLAT_COLUMNS,
+    ColumnarWriter,
+    CsvWriter,
+    InputErrors,
+    NdjsonWriter,
+    open_writer,
+    read_columnar,
+    read_ndjson_inputs,
+    write_results,
+)
+
+
+def _input(total: float) -> SimpleInput:
+    return SimpleInput(
+        totalWorkHoursToDate=total,
+        holidayWorkHoursToDate=2.0,
+        workingDaysElapsed=15,
+        workingDaysRemaining=8,
+        currentDate="2025-04-18",
+        autoCalculateWeekdays=False,
+    )
+
+
+def _records(count: int):
+    for i in range(count):
+        yield f"E{i:04d}", _input(100.0 + i)
+
+
+class TestAssessBatch:
+    """assess_batch関数のテスト"""
+
+    def test_yields_lazily(self):
+        """入力を消費した分だけ評価される"""
+        consumed = []
+
+        def source():
+            for employee_id, input_data in _records(3):
+                consumed.append(employee_id)
+                yield employee_id, input_data
+
+        results = assess_batch(source())
+        assert consumed == []
+        employee_id, result = next(results)
+        assert consumed == ["E0000"]
+        assert result == assess_current_month(_input(100.0))
+
+
+class TestWriters:
+    """各ライターのテスト"""
+
+    def test_ndjson_round_trip(self):
+        """NDJSON: 1行1件で完全な結果を出力"""
+        stream = io.StringIO()
+        count = write_results(assess_batch(_records(3)), NdjsonWriter(stream))
+
+        lines = stream.getvalue().splitlines()
+        assert count == 3
+        assert len(lines) == 3
+        first = json.loads(lines[0])
+        assert first["employeeId"] == "E0000"
+        assert first["evaluation45"]["recoveryOptions"]
+
+    def test_csv_flattened_columns(self):
+        """CSV: evaluation45/evaluation80 をフラット化"""
+        stream = io.StringIO()
+        write_results(assess_batch(_records(2)), CsvWriter(stream))
+
+        stream.seek(0)
+        rows = list(csv.DictReader(stream))
+        assert list(rows[0].keys()) == FLAT_COLUMNS
+        assert rows[1]["employeeId"] == "E0001"
+        assert rows[0]["evaluation45.riskLevel"] in ("OK", "WARN", "LIMIT")
+        assert float(rows[0]["evaluation80.limit"]) == 80.0
+
+    def test_columnar_round_trip_across_row_groups(self):
+        """列指向バイナリ: 行グループをまたいで読み戻せる"""
+        stream = io.BytesIO()
+        write_results(assess_batch(_records(7)), ColumnarWriter(stream, row_group_size=3))
+
+        stream.seek(0)
+        rows = list(read_columnar(stream))
+        assert [row["employeeId"] for row in rows] == [f"E{i:04d}" for i in range(7)]
+
+        expected = assess_current_month(_input(106.0))
+        assert rows[6]["evaluation45.projectedTotalWorkHours"] == pytest.approx(
+            expected.evaluation45.projectedTotalWorkHours
+        )
+        assert rows[6]["evaluation45.riskLevel"] == expected.evaluation45.riskLevel
+
+    def test_columnar_buffer_is_bounded(self):
+        """列指向バイナリ: 行グループ単位で書き出される"""
+        stream = io.BytesIO()
+        writer = ColumnarWriter(stream, row_group_size=2)
+        header_size = len(stream.getvalue())
+
+        results = assess_batch(_records(2))
+        writer.write(*next(results))
+        assert len(stream.getvalue()) == header_size
+        writer.write(*next(results))
+        assert len(stream.getvalue()) > header_size
+
+    def test_columnar_rejects_invalid_stream(self):
+        """不正なストリームはエラー"""
+        with pytest.raises(ValueError):
+            list(read_columnar(io.BytesIO(b"XXXX")))
+
+    def test_open_writer_unknown_format(self):
+        """未対応の出力形式はエラー"""
+        with pytest.raises(ValueError):
+            open_writer("xml", io.StringIO())  # type: ignore[arg-type]
+
+
+class TestReadNdjsonInputs:
+    """read_ndjson_inputs関数のテスト"""
+
+    def test_reads_employee_id_and_skips_blank_lines(self):
+        """employeeId を取り出し、空行は無視"""
+        source = io.StringIO(
+            '{"employeeId": "A1", "totalWorkHoursToDate": 10, "holidayWorkHoursToDate": 0}\n'
+            "\n"
+            '{"totalWorkHoursToDate": 20, "holidayWorkHoursToDate": 1}\n'
+        )
+        records = list(read_ndjson_inputs(source))
+        assert records[0][0] == "A1"
+        assert records[0][1].totalWorkHoursToDate == 10
+        assert records[1][0] == "3"
+
+    def test_invalid_line_raises_with_line_number(self):
+        """不正な行は行番号付きでエラー"""
+        source = io.StringIO(
+            '{"totalWorkHoursToDate": 10, "holidayWorkHoursToDate": 0}\n'
+            '{"totalWorkHoursToDate": -1, "holidayWorkHoursToDate": 0}\n'
+        )
+        with pytest.raises(ValueError, match="line 2"):
+            list(read_ndjson_inputs(source))
+
+    def test_invalid_lines_are_skipped_and_recorded(self):
+        """errors 指定時は不正な行を読み飛ばして記録"""
+        source = io.StringIO(
+            "not json\n"
+            "[1, 2]\n"
+            '{"totalWorkHoursToDate": 10, "holidayWorkHoursToDate": 0}\n'
+            '{"totalWorkHoursToDate": 10}\n'
+        )
+        errors = InputErrors(max_reported=2)
+        records = list(read_ndjson_inputs(source, errors))
+        assert [employee_id for employee_id, _ in records] == ["3"]
+        assert errors.count == 3
+        assert [e["line"] for e in errors.reported] == [1, 2]
+
+
+class TestAssessBatchTool:
+    """assess_batch_tool のテスト（MCP経由）"""
+
+    @staticmethod
+    def _call(arguments: dict) -> dict:
+        async def call() -> dict:
+            async with Client(mcp) as client:
+                result = await client.call_tool("assess_batch_tool", arguments)
+                return result.structured_content
+
+        return asyncio.run(call())
+
+    @pytest.mark.parametrize("output_format", ["ndjson", "csv", "columnar"])
+    def test_end_to_end(self, tmp_path, output_format):
+        """入力ファイルを評価し、不正な行は読み飛ばして件数を返す"""
+        input_path = tmp_path / "input.ndjson"
+        input_path.write_text(
+            '{"employeeId": "E1", "totalWorkHoursToDate": 150.5, '
+            '"holidayWorkHoursToDate": 8.0, "currentDate": "2025-10-20"}\n'
+            "{broken\n"
+            '{"employeeId": "E2", "totalWorkHoursToDate": 80.0, '
+            '"holidayWorkHoursToDate": 0.0, "currentDate": "2025-10-20"}\n',
+            encoding="utf-8",
+        )
+        output_path = tmp_path / f"output.{output_format}"
+
+        result = self._call(
+            {
+                "inputPath": str(input_path),
+                "outputPath": str(output_path),
+                "outputFormat": output_format,
+            }
+        )
+
+        assert result["count"] == 2
+        assert result["errorCount"] == 1
+        assert result["errors"][0]["line"] == 2
+
+        if output_format == "columnar":
+            with open(output_path, "rb") as stream:
+                employee_ids = [row["employeeId"] for row in read_columnar(stream)]
+        elif output_format == "csv":
+            with open(output_path, encoding="utf-8", newline="") as stream:
+                employee_ids = [row["employeeId"] for row in csv.DictReader(stream)]
+        else:
+            lines = output_path.read_text(encoding="utf-8").splitlines()
+            employee_ids = [json.loads(line)["employeeId"] for line in lines]
+        assert employee_ids == ["E1", "E2"]
+
+    def test_evaluation_error_is_skipped(self, tmp_path):
+        """評価時に失敗した行も読み飛ばし、以降の行の評価を続ける"""
+        input_path = tmp_path / "input.ndjson"
+        input_path.write_text(
+            '{"employeeId": "E1", "totalWorkHoursToDate": 150.5, '
+            '"holidayWorkHoursToDate": 8.0, "currentDate": "2025-10-20"}\n'
+            '{"employeeId": "E2", "totalWorkHoursToDate": 80.0, '
+            '"holidayWorkHoursToDate": 0.0, "currentDate": "2025-02-30"}\n'
+            '{"employeeId": "E3", "totalWorkHoursToDate": 80.0, '
+            '"holidayWorkHoursToDate": 0.0, "currentDate": "2025-10-20"}\n',
+            encoding="utf-8",
+        )
+        output_path = tmp_path / "output.csv"
+
+        result = self._call(
+            {"inputPath": str(input_path), "outputPath": str(output_path), "outputFormat": "csv"}
+        )
+
+        assert result["count"] == 2
+        assert result["errorCount"] == 1
+        assert result["errors"][0]["line"] == 2
+        assert result["errors"][0]["message"].startswith("E2: ")
+        with open(output_path, encoding="utf-8", newline="") as stream:
+            employee_ids = [row["employeeId"] for row in csv.DictReader(stream)]
+        assert employee_ids == ["E1", "E3"]